@@ -12,232 +12,244 @@ DEFAULT_DATA_SERVICE_URL = "http://localhost:8001/api"
 DEFAULT_MODEL_SERVICE_URL = "http://localhost:8002/api"
 DEFAULT_DASHBOARD_SERVICE_URL = "http://localhost:8000/api"
 
-async def test_data_ingestion_api(url: str):
+# Maximum number of requests in flight at once
+MAX_CONCURRENT_REQUESTS = 20
+
+async def gather_requests(*requests):
+    """Run independent requests concurrently, bounded by a semaphore."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async def bounded(request):
+        async with semaphore:
+            return await request
+    
+    return await asyncio.gather(*(bounded(request) for request in requests))
+
+async def test_data_ingestion_api(client: httpx.AsyncClient, url: str):
     """Test the data ingestion API."""
     print("=== Testing Data Ingestion API ===")
     
-    async with httpx.AsyncClient() as client:
-        # Test adding a stock
-        print("Testing adding a stock...")
-        response = await client.post(
-            f"{url}/stocks",
-            json={"ticker": "AAPL"}
-        )
-        
+    # Test adding a stock
+    print("Testing adding a stock...")
+    response = await client.post(
+        f"{url}/stocks",
+        json={"ticker": "AAPL"}
+    )
+    
+    if response.status_code == 200:
+        stock_data = response.json()
+        stock_id = stock_data["id"]
+        print(f"Successfully added stock AAPL with ID {stock_id}")
+    else:
+        print(f"Failed to add stock: {response.text}")
+        # Try to get the stock if it already exists
+        response = await client.get(f"{url}/stocks")
         if response.status_code == 200:
-            stock_data = response.json()
-            stock_id = stock_data["id"]
-            print(f"Successfully added stock AAPL with ID {stock_id}")
-        else:
-            print(f"Failed to add stock: {response.text}")
-            # Try to get the stock if it already exists
-            response = await client.get(f"{url}/stocks")
-            if response.status_code == 200:
-                stocks = response.json()
-                for stock in stocks:
-                    if stock["ticker"] == "AAPL":
-                        stock_id = stock["id"]
-                        print(f"Found existing stock AAPL with ID {stock_id}")
-                        break
-                else:
-                    print("Could not find AAPL stock")
-                    return
+            stocks = response.json()
+            for stock in stocks:
+                if stock["ticker"] == "AAPL":
+                    stock_id = stock["id"]
+                    print(f"Found existing stock AAPL with ID {stock_id}")
+                    break
             else:
-                print(f"Failed to get stocks: {response.text}")
+                print("Could not find AAPL stock")
                 return
-        
-        # Test importing historical data
-        print("Testing importing historical data...")
-        response = await client.post(
-            f"{url}/data/import_historical",
-            json={"days": 30},
-            params={"stock_id": stock_id}
-        )
-        
-        if response.status_code == 200:
-            print(f"Successfully imported historical data: {response.json()}")
         else:
-            print(f"Failed to import historical data: {response.text}")
-        
-        # Test generating features
-        print("Testing generating features...")
-        response = await client.post(
-            f"{url}/features/generate/{stock_id}",
-            params={"days": 30}
-        )
-        
-        if response.status_code == 200:
-            print(f"Successfully generated features: {response.json()}")
-        else:
-            print(f"Failed to generate features: {response.text}")
-        
-        # Test getting latest data
-        print("Testing getting latest data...")
-        response = await client.get(f"{url}/data/latest/{stock_id}")
-        
-        if response.status_code == 200:
-            print(f"Successfully retrieved latest data: {response.json()}")
-        else:
-            print(f"Failed to retrieve latest data: {response.text}")
+            print(f"Failed to get stocks: {response.text}")
+            return
+    
+    # Test importing historical data
+    print("Testing importing historical data...")
+    response = await client.post(
+        f"{url}/data/import_historical",
+        json={"days": 30},
+        params={"stock_id": stock_id}
+    )
+    
+    if response.status_code == 200:
+        print(f"Successfully imported historical data: {response.json()}")
+    else:
+        print(f"Failed to import historical data: {response.text}")
+    
+    # Test generating features
+    print("Testing generating features...")
+    response = await client.post(
+        f"{url}/features/generate/{stock_id}",
+        params={"days": 30}
+    )
+    
+    if response.status_code == 200:
+        print(f"Successfully generated features: {response.json()}")
+    else:
+        print(f"Failed to generate features: {response.text}")
+    
+    # Test getting latest data
+    print("Testing getting latest data...")
+    response = await client.get(f"{url}/data/latest/{stock_id}")
+    
+    if response.status_code == 200:
+        print(f"Successfully retrieved latest data: {response.json()}")
+    else:
+        print(f"Failed to retrieve latest data: {response.text}")
     
     print("Data Ingestion API tests completed")
 
-async def test_model_service_api(url: str):
+async def test_model_service_api(client: httpx.AsyncClient, url: str):
     """Test the model service API."""
     print("=== Testing Model Service API ===")
     
-    async with httpx.AsyncClient() as client:
-        # Test creating a model
-        print("Testing creating a model...")
-        model_config = {
-            "architecture": "LSTM",
-            "name": "LSTM_Test",
-            "version": "1.0.0",
-            "hyperparameters": {
-                "hidden_dim": 64,
-                "num_layers": 2,
-                "dropout": 0.2,
-                "learning_rate": 0.001,
-                "batch_size": 32,
-                "epochs": 10,
-                "lookback_window": 20,
-                "forecast_horizon": 5
-            },
-            "feature_config": {
-                "time_varying_features": ["open", "high", "low", "close", "volume"]
-            },
-            "training_dataset_config": {
-                "train_test_split": 0.8,
-                "lookback_window": 20,
-                "forecast_horizon": 5,
-                "stocks": "all"
-            }
+    # Test creating a model
+    print("Testing creating a model...")
+    model_config = {
+        "architecture": "LSTM",
+        "name": "LSTM_Test",
+        "version": "1.0.0",
+        "hyperparameters": {
+            "hidden_dim": 64,
+            "num_layers": 2,
+            "dropout": 0.2,
+            "learning_rate": 0.001,
+            "batch_size": 32,
+            "epochs": 10,
+            "lookback_window": 20,
+            "forecast_horizon": 5
+        },
+        "feature_config": {
+            "time_varying_features": ["open", "high", "low", "close", "volume"]
+        },
+        "training_dataset_config": {
+            "train_test_split": 0.8,
+            "lookback_window": 20,
+            "forecast_horizon": 5,
+            "stocks": "all"
         }
-        
-        response = await client.post(
-            f"{url}/models",
-            json=model_config
-        )
-        
+    }
+    
+    response = await client.post(
+        f"{url}/models",
+        json=model_config
+    )
+    
+    if response.status_code == 200:
+        model_data = response.json()
+        model_id = model_data["id"]
+        print(f"Successfully created model with ID {model_id}")
+    else:
+        print(f"Failed to create model: {response.text}")
+        # Try to get an existing model
+        response = await client.get(f"{url}/models")
         if response.status_code == 200:
-            model_data = response.json()
-            model_id = model_data["id"]
-            print(f"Successfully created model with ID {model_id}")
-        else:
-            print(f"Failed to create model: {response.text}")
-            # Try to get an existing model
-            response = await client.get(f"{url}/models")
-            if response.status_code == 200:
-                models = response.json()
-                if models:
-                    model_id = models[0]["id"]
-                    print(f"Using existing model with ID {model_id}")
-                else:
-                    print("No models found")
-                    return
+            models = response.json()
+            if models:
+                model_id = models[0]["id"]
+                print(f"Using existing model with ID {model_id}")
             else:
-                print(f"Failed to get models: {response.text}")
+                print("No models found")
                 return
-        
-        # Test training a model
-        print("Testing training a model...")
-        response = await client.post(
-            f"{url}/models/{model_id}/train"
-        )
-        
-        if response.status_code == 200:
-            print(f"Successfully started model training: {response.json()}")
-        else:
-            print(f"Failed to start model training: {response.text}")
-        
-        # Wait for training to complete
-        print("Waiting for training to complete (10 seconds)...")
-        await asyncio.sleep(10)
-        
-        # Test model status
-        print("Testing model status...")
-        response = await client.get(f"{url}/models/{model_id}")
-        
-        if response.status_code == 200:
-            print(f"Model status: {response.json()['status']}")
         else:
-            print(f"Failed to get model status: {response.text}")
-        
-        # Test generating predictions
-        print("Testing generating predictions...")
-        # Get a stock ID
-        response = await client.get(f"{url.replace('/api', '')}/api/stocks")
-        
-        if response.status_code == 200:
-            stocks = response.json()
-            if stocks:
-                stock_id = stocks[0]["id"]
-                print(f"Using stock with ID {stock_id}")
-                
-                # Generate predictions
-                response = await client.post(
-                    f"{url}/predictions",
-                    json={
-                        "model_id": model_id,
-                        "stock_id": stock_id,
-                        "save_to_db": True
-                    }
-                )
-                
-                if response.status_code == 200:
-                    print(f"Successfully generated predictions: {response.json()}")
-                else:
-                    print(f"Failed to generate predictions: {response.text}")
+            print(f"Failed to get models: {response.text}")
+            return
+    
+    # Test training a model
+    print("Testing training a model...")
+    response = await client.post(
+        f"{url}/models/{model_id}/train"
+    )
+    
+    if response.status_code == 200:
+        print(f"Successfully started model training: {response.json()}")
+    else:
+        print(f"Failed to start model training: {response.text}")
+    
+    # Wait for training to complete
+    print("Waiting for training to complete (10 seconds)...")
+    await asyncio.sleep(10)
+    
+    # Test model status and get a stock ID for predictions (independent requests)
+    print("Testing model status...")
+    status_response, stocks_response = await gather_requests(
+        client.get(f"{url}/models/{model_id}"),
+        client.get(f"{url.replace('/api', '')}/api/stocks")
+    )
+    
+    if status_response.status_code == 200:
+        print(f"Model status: {status_response.json()['status']}")
+    else:
+        print(f"Failed to get model status: {status_response.text}")
+    
+    # Test generating predictions
+    print("Testing generating predictions...")
+    response = stocks_response
+    
+    if response.status_code == 200:
+        stocks = response.json()
+        if stocks:
+            stock_id = stocks[0]["id"]
+            print(f"Using stock with ID {stock_id}")
+            
+            # Generate predictions
+            response = await client.post(
+                f"{url}/predictions",
+                json={
+                    "model_id": model_id,
+                    "stock_id": stock_id,
+                    "save_to_db": True
+                }
+            )
+            
+            if response.status_code == 200:
+                print(f"Successfully generated predictions: {response.json()}")
             else:
-                print("No stocks found")
+                print(f"Failed to generate predictions: {response.text}")
         else:
-            print(f"Failed to get stocks: {response.text}")
+            print("No stocks found")
+    else:
+        print(f"Failed to get stocks: {response.text}")
     
     print("Model Service API tests completed")
 
-async def test_dashboard_api(url: str):
+async def test_dashboard_api(client: httpx.AsyncClient, url: str):
     """Test the dashboard API."""
     print("=== Testing Dashboard API ===")
     
-    async with httpx.AsyncClient() as client:
-        # Test getting stocks
-        print("Testing getting stocks...")
-        response = await client.get(f"{url}/stocks")
-        
-        if response.status_code == 200:
-            stocks = response.json()
-            print(f"Successfully retrieved {len(stocks)} stocks")
-            if stocks:
-                stock_id = stocks[0]["id"]
-            else:
-                print("No stocks found")
-                return
+    # Test getting stocks and models (independent requests)
+    print("Testing getting stocks and models...")
+    stocks_response, models_response = await gather_requests(
+        client.get(f"{url}/stocks"),
+        client.get(f"{url}/models")
+    )
+    
+    if stocks_response.status_code == 200:
+        stocks = stocks_response.json()
+        print(f"Successfully retrieved {len(stocks)} stocks")
+        if stocks:
+            stock_id = stocks[0]["id"]
         else:
-            print(f"Failed to get stocks: {response.text}")
+            print("No stocks found")
             return
-        
-        # Test getting models
-        print("Testing getting models...")
-        response = await client.get(f"{url}/models")
-        
-        if response.status_code == 200:
-            models = response.json()
-            print(f"Successfully retrieved {len(models)} models")
-            if models:
-                model_id = models[0]["id"]
-            else:
-                print("No models found")
-                return
+    else:
+        print(f"Failed to get stocks: {stocks_response.text}")
+        return
+    
+    if models_response.status_code == 200:
+        models = models_response.json()
+        print(f"Successfully retrieved {len(models)} models")
+        if models:
+            model_id = models[0]["id"]
         else:
-            print(f"Failed to get models: {response.text}")
+            print("No models found")
             return
-        
-        # Test getting prediction comparison
-        print("Testing getting prediction comparison...")
-        start_date = (datetime.now() - timedelta(days=30)).isoformat()
-        end_date = (datetime.now() + timedelta(days=5)).isoformat()
-        
-        response = await client.get(
+    else:
+        print(f"Failed to get models: {models_response.text}")
+        return
+    
+    # Test getting prediction comparison, feature importance and metrics (independent requests)
+    print("Testing getting prediction comparison, feature importance and metrics...")
+    start_date = (datetime.now() - timedelta(days=30)).isoformat()
+    end_date = (datetime.now() + timedelta(days=5)).isoformat()
+    
+    comparison_response, importance_response, metrics_response = await gather_requests(
+        client.get(
             f"{url}/predictions/comparison",
             params={
                 "stock_id": stock_id,
@@ -245,21 +257,25 @@ async def test_dashboard_api(url: str):
                 "start_date": start_date,
                 "end_date": end_date
             }
-        )
-        
-        if response.status_code == 200:
-            print(f"Successfully retrieved prediction comparison")
-        else:
-            print(f"Failed to get prediction comparison: {response.text}")
-        
-        # Test getting feature importance
-        print("Testing getting feature importance...")
-        response = await client.get(f"{url}/models/{model_id}/feature_importance")
-        
-        if response.status_code == 200:
-            print(f"Successfully retrieved feature importance")
-        else:
-            print(f"Failed to get feature importance: {response.text}")
+        ),
+        client.get(f"{url}/models/{model_id}/feature_importance"),
+        client.get(f"{url}/models/{model_id}/metrics")
+    )
+    
+    if comparison_response.status_code == 200:
+        print(f"Successfully retrieved prediction comparison")
+    else:
+        print(f"Failed to get prediction comparison: {comparison_response.text}")
+    
+    if importance_response.status_code == 200:
+        print(f"Successfully retrieved feature importance")
+    else:
+        print(f"Failed to get feature importance: {importance_response.text}")
+    
+    if metrics_response.status_code == 200:
+        print(f"Successfully retrieved model metrics")
+    else:
+        print(f"Failed to get model metrics: {metrics_response.text}")
     
     print("Dashboard API tests completed")
 
@@ -279,16 +295,26 @@ async def main():
     if not (args.test_data or args.test_model or args.test_dashboard):
         args.test_all = True
     
-    if args.test_all or args.test_data:
-        await test_data_ingestion_api(args.data_url)
-        print()
+    # Share one pooled client across all suites so connections are reused
+    client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        timeout=30.0
+    )
     
-    if args.test_all or args.test_model:
-        await test_model_service_api(args.model_url)
-        print()
-    
-    if args.test_all or args.test_dashboard:
-        await test_dashboard_api(args.dashboard_url)
+    try:
+        if args.test_all or args.test_data:
+            await test_data_ingestion_api(client, args.data_url)
+            print()
+        
+        if args.test_all or args.test_model:
+            await test_model_service_api(client, args.model_url)
+            print()
+        
+        if args.test_all or args.test_dashboard:
+            await test_dashboard_api(client, args.dashboard_url)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,9 +1,17 @@
-import json
 import logging
 import logging.config
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+import orjson
+
+# Standard LogRecord attributes that should not be emitted as extra fields
+_RESERVED_ATTRS = frozenset({
+    "args", "asctime", "created", "exc_info", "exc_text", "filename",
+    "funcName", "id", "levelname", "levelno", "lineno", "module",
+    "msecs", "message", "msg", "name", "pathname", "process",
+    "processName", "relativeCreated", "stack_info", "thread", "threadName"
+})
 
 class JSONFormatter(logging.Formatter):
     """
@@ -15,7 +23,7 @@ class JSONFormatter(logging.Formatter):
 
     def format(self, record):
         logobj = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc),
             "service": self.service_name,
             "name": record.name,
             "level": record.levelname,
@@ -28,13 +36,10 @@ class JSONFormatter(logging.Formatter):
         
         # Add extra fields
         for key, value in record.__dict__.items():
-            if key not in ["args", "asctime", "created", "exc_info", "exc_text", "filename",
-                         "funcName", "id", "levelname", "levelno", "lineno", "module",
-                         "msecs", "message", "msg", "name", "pathname", "process",
-                         "processName", "relativeCreated", "stack_info", "thread", "threadName"]:
+            if key not in _RESERVED_ATTRS:
                 logobj[key] = value
         
-        return json.dumps(logobj)
+        return orjson.dumps(logobj, default=str, option=orjson.OPT_UTC_Z).decode()
 
 def configure_logging(service_name, log_level=None):
     """
@@ -1,9 +1,11 @@
+import asyncio
+import threading
 import time
-from fastapi import Request
+from collections import deque
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
-from typing import Callable
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Deque, Dict, Optional, Tuple
 
 # Define metrics
 HTTP_REQUESTS_TOTAL = Counter(
@@ -45,35 +47,120 @@ MODEL_TRAINING_TOTAL = Counter(
     ['model_type', 'status']
 )
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip metrics endpoint to avoid circular calls
-        if request.url.path == "/metrics":
-            return await call_next(request)
-        
-        # Record request start time
-        start_time = time.time()
-        
-        # Process request
-        response = await call_next(request)
+# Paths excluded from request metrics: the metrics endpoint itself and health probes
+_SKIP_PATHS = frozenset({"/metrics", "/health"})
+
+# How often buffered request observations are written to the metrics
+FLUSH_INTERVAL_SECONDS = 0.1
+
+# Upper bound on buffered observations; the oldest are dropped beyond this
+MAX_PENDING_OBSERVATIONS = 10000
+
+# How long a rendered metrics snapshot is served before being regenerated
+METRICS_SNAPSHOT_TTL_SECONDS = 0.5
+
+# (monotonic time rendered, rendered metrics) for the latest scrape
+_metrics_snapshot: Tuple[float, bytes] = (0.0, b"")
+_metrics_snapshot_lock = threading.Lock()
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts and durations.
+    
+    Observations are buffered per request and applied to the Prometheus
+    metrics in batches by a background task, keeping metric locks off the
+    request path.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Pre-labeled metric children, keyed by their label values
+        self._request_counters: Dict[Tuple[str, str, int], Counter] = {}
+        self._request_durations: Dict[Tuple[str, str], Histogram] = {}
+        # (method, endpoint, status, duration) tuples awaiting a flush
+        self._pending: Deque[Tuple[str, str, int, float]] = deque(maxlen=MAX_PENDING_OBSERVATIONS)
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip non-HTTP traffic, metric scrapes and health probes
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        # Record request end time and calculate duration
-        duration = time.time() - start_time
+        status = 500
         
-        # Extract endpoint and method
-        endpoint = request.url.path
-        method = request.method
-        status = response.status_code
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
         
-        # Update metrics
-        HTTP_REQUESTS_TOTAL.labels(method=method, endpoint=endpoint, status=status).inc()
-        HTTP_REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+        # Record request start time
+        start_time = time.perf_counter()
         
-        return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            
+            # Use the matched route template so label cardinality stays bounded;
+            # requests that match no route (e.g. 404s) share a single label
+            route = scope.get("route")
+            endpoint = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            
+            self._pending.append((method, endpoint, status, duration))
+            
+            # Middleware has no startup hook, so start the flusher on first use
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_periodically())
+    
+    async def _flush_periodically(self) -> None:
+        """Drain buffered observations into the metrics at a fixed interval."""
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            self._flush()
+    
+    def _flush(self) -> None:
+        """Apply all buffered observations to the request metrics."""
+        pending = self._pending
+        while pending:
+            method, endpoint, status, duration = pending.popleft()
+            self._get_counter(method, endpoint, status).inc()
+            self._get_histogram(method, endpoint).observe(duration)
+    
+    def _get_counter(self, method: str, endpoint: str, status: int) -> Counter:
+        """Get the request counter child for a set of label values."""
+        key = (method, endpoint, status)
+        counter = self._request_counters.get(key)
+        if counter is None:
+            counter = HTTP_REQUESTS_TOTAL.labels(method=method, endpoint=endpoint, status=status)
+            self._request_counters[key] = counter
+        return counter
+    
+    def _get_histogram(self, method: str, endpoint: str) -> Histogram:
+        """Get the request duration histogram child for a set of label values."""
+        key = (method, endpoint)
+        histogram = self._request_durations.get(key)
+        if histogram is None:
+            histogram = HTTP_REQUEST_DURATION.labels(method=method, endpoint=endpoint)
+            self._request_durations[key] = histogram
+        return histogram
+
+def _get_metrics_snapshot() -> bytes:
+    """Get the rendered metrics, regenerating them at most once per TTL."""
+    global _metrics_snapshot
+    
+    with _metrics_snapshot_lock:
+        rendered_at, content = _metrics_snapshot
+        now = time.monotonic()
+        if now - rendered_at >= METRICS_SNAPSHOT_TTL_SECONDS:
+            content = generate_latest()
+            _metrics_snapshot = (now, content)
+        return content
 
 async def metrics_endpoint():
     """Endpoint for exposing Prometheus metrics."""
     return Response(
-        content=generate_latest(),
+        content=_get_metrics_snapshot(),
         media_type=CONTENT_TYPE_LATEST
     )
\ No newline at end of file
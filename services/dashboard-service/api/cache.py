@@ -0,0 +1,68 @@
+import functools
+import inspect
+import logging
+from typing import Any, Callable, List, Optional
+import orjson
+from fastapi import Response
+from fastapi.params import Depends
+
+from redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+def _default_cache_key(**kwargs: Any) -> str:
+    """Build a cache key from the endpoint's keyword arguments."""
+    return ":".join(f"{name}={value}" for name, value in sorted(kwargs.items()))
+
+def cached(
+    ttl: int,
+    key_fn: Optional[Callable[..., str]] = None,
+    track_fn: Optional[Callable[..., List[str]]] = None
+):
+    """
+    Cache a JSON endpoint's response body in Redis.
+    
+    Args:
+        ttl: Time to live for cached responses in seconds
+        key_fn: Builds the cache key from the endpoint's keyword arguments
+        track_fn: Names the Redis sets the cache key is recorded in, for targeted invalidation
+    
+    Returns:
+        Decorator that serves cached bytes directly on a hit
+    """
+    key_fn = key_fn or _default_cache_key
+    
+    def decorator(func: Callable) -> Callable:
+        # Injected dependencies (services, sessions) never form part of the key
+        key_params = [
+            name
+            for name, param in inspect.signature(func).parameters.items()
+            if not isinstance(param.default, Depends)
+        ]
+        
+        @functools.wraps(func)
+        async def wrapper(**kwargs: Any) -> Any:
+            redis_client = get_redis_client()
+            key_kwargs = {name: kwargs[name] for name in key_params if name in kwargs}
+            cache_key = f"response:{func.__name__}:{key_fn(**key_kwargs)}"
+            
+            # Serve the already-serialized body to skip re-encoding
+            cached_body = await redis_client.get_bytes(cache_key)
+            if cached_body is not None:
+                return Response(content=cached_body, media_type="application/json")
+            
+            result = await func(**kwargs)
+            
+            body = orjson.dumps(result, option=orjson.OPT_NAIVE_UTC)
+            await redis_client.setex_bytes(cache_key, ttl, body)
+            if track_fn is not None:
+                await redis_client.track_keys(
+                    {set_key: [cache_key] for set_key in track_fn(**key_kwargs)},
+                    ttl
+                )
+            
+            return Response(content=body, media_type="application/json")
+        
+        return wrapper
+    
+    return decorator
\ No newline at end of file
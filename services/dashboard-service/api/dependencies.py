@@ -0,0 +1,12 @@
+from fastapi import Request
+
+from services.dashboard_service import DashboardService
+from services.settings_service import SettingsService
+
+def get_dashboard_service(request: Request) -> DashboardService:
+    """Get the dashboard service created at application startup."""
+    return request.app.state.dashboard_service
+
+def get_settings_service(request: Request) -> SettingsService:
+    """Get the settings service created at application startup."""
+    return request.app.state.settings_service
\ No newline at end of file
@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import ciso8601
 
-from services.dashboard_service import DashboardService
+from config import settings
+from services.dashboard_service import DashboardService, comparison_keys_set, model_comparison_keys_set
 from models.api import PredictionRequest, StockComparisonRequest
+from api.cache import cached
+from api.dependencies import get_dashboard_service
 
 router = APIRouter()
-dashboard_service = DashboardService()
+
+def _comparison_cache_key(
+    stock_id: int,
+    model_ids: List[int],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> str:
+    """Build the cache key for a prediction comparison request."""
+    model_key = ",".join(str(model_id) for model_id in sorted(model_ids))
+    return f"{stock_id}:{model_key}:{start_date}:{end_date}"
+
+def _comparison_tracking_sets(stock_id: int, model_ids: List[int], **_: Any) -> List[str]:
+    """Name the sets tracking cached comparison responses for the stock and each model."""
+    return [comparison_keys_set(stock_id), *(model_comparison_keys_set(model_id) for model_id in model_ids)]
 
 @router.get("/stocks")
-async def get_stocks():
+@cached(ttl=settings.DEFAULT_CACHE_TTL_SECONDS)
+async def get_stocks(
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
     """Get list of stocks."""
     stocks = await dashboard_service.get_stocks()
     if not stocks:
@@ -17,7 +37,10 @@ async def get_stocks():
     return stocks
 
 @router.get("/models")
-async def get_models():
+@cached(ttl=settings.MODEL_CACHE_TTL_SECONDS)
+async def get_models(
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
     """Get list of models."""
     models = await dashboard_service.get_models()
     if not models:
@@ -25,16 +48,22 @@ async def get_models():
     return models
 
 @router.get("/predictions/comparison")
+@cached(
+    ttl=settings.DEFAULT_CACHE_TTL_SECONDS,
+    key_fn=_comparison_cache_key,
+    track_fn=_comparison_tracking_sets
+)
 async def get_prediction_comparison(
     stock_id: int,
     model_ids: List[int],
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
 ):
     """Get comparison data for multiple models for a specific stock."""
     # Parse dates if provided
-    start_date_dt = datetime.fromisoformat(start_date) if start_date else None
-    end_date_dt = datetime.fromisoformat(end_date) if end_date else None
+    start_date_dt = ciso8601.parse_datetime(start_date) if start_date else None
+    end_date_dt = ciso8601.parse_datetime(end_date) if end_date else None
     
     comparison = await dashboard_service.get_prediction_comparison(
         stock_id, model_ids, start_date_dt, end_date_dt
@@ -45,8 +74,20 @@ async def get_prediction_comparison(
     
     return comparison
 
+@router.get("/dashboard/{stock_id}")
+async def get_dashboard_bundle(
+    stock_id: int,
+    model_ids: List[int] = Query(...),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
+    """Get models, feature importance and prediction comparison for a dashboard page."""
+    return await dashboard_service.get_dashboard_bundle(stock_id, model_ids)
+
 @router.post("/predictions")
-async def generate_prediction(request: PredictionRequest):
+async def generate_prediction(
+    request: PredictionRequest,
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
     """Generate a new prediction for a stock using a model."""
     result = await dashboard_service.generate_prediction(
         request.model_id, request.stock_id
@@ -58,7 +99,11 @@ async def generate_prediction(request: PredictionRequest):
     return result
 
 @router.get("/models/{model_id}/feature_importance")
-async def get_feature_importance(model_id: int):
+@cached(ttl=settings.MODEL_CACHE_TTL_SECONDS)
+async def get_feature_importance(
+    model_id: int,
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
     """Get feature importance for a model."""
     result = await dashboard_service.get_feature_importance(model_id)
     
@@ -68,7 +113,11 @@ async def get_feature_importance(model_id: int):
     return result
 
 @router.get("/models/{model_id}/metrics")
-async def get_model_metrics(model_id: int):
+@cached(ttl=settings.DEFAULT_CACHE_TTL_SECONDS)
+async def get_model_metrics(
+    model_id: int,
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
     """Get performance metrics for a model."""
     result = await dashboard_service.get_model_metrics(model_id)
     
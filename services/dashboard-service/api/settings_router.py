@@ -5,6 +5,7 @@ from typing import List, Dict, Optional
 from db import get_db_session
 from services.settings_service import SettingsService
 from services.auth_service import get_current_user
+from api.dependencies import get_settings_service
 from models.api import (
     SettingsProfileResponse,
     SettingsProfileCreate,
@@ -12,12 +13,12 @@ from models.api import (
 )
 
 router = APIRouter(prefix="/settings")
-settings_service = SettingsService()
 
 @router.get("/profiles", response_model=List[SettingsProfileResponse])
 async def get_settings_profiles(
     current_user = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_db_session),
+    settings_service: SettingsService = Depends(get_settings_service)
 ):
     """Get all settings profiles for the current user."""
     return await settings_service.get_user_profiles(current_user.id, session)
@@ -25,7 +26,8 @@ async def get_settings_profiles(
 @router.get("/profiles/active", response_model=SettingsProfileResponse)
 async def get_active_profile(
     current_user = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_db_session),
+    settings_service: SettingsService = Depends(get_settings_service)
 ):
     """Get the active settings profile for the current user."""
     profile = await settings_service.get_active_profile(current_user.id, session)
@@ -40,7 +42,8 @@ async def get_active_profile(
 async def create_settings_profile(
     profile: SettingsProfileCreate,
     current_user = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_db_session),
+    settings_service: SettingsService = Depends(get_settings_service)
 ):
     """Create a new settings profile."""
     return await settings_service.create_profile(
@@ -48,7 +51,7 @@ async def create_settings_profile(
         profile.name,
         profile.settings,
         profile.is_active,
-        session
+        session=session
     )
 
 @router.put("/profiles/{profile_id}", response_model=SettingsProfileResponse)
@@ -56,7 +59,8 @@ async def update_settings_profile(
     profile_id: int,
     profile: SettingsProfileUpdate,
     current_user = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_db_session),
+    settings_service: SettingsService = Depends(get_settings_service)
 ):
     """Update an existing settings profile."""
     updated_profile = await settings_service.update_profile(
@@ -64,7 +68,7 @@ async def update_settings_profile(
         profile.name,
         profile.settings,
         profile.is_active,
-        session
+        session=session
     )
     
     if not updated_profile:
@@ -76,7 +80,8 @@ async def update_settings_profile(
 async def delete_settings_profile(
     profile_id: int,
     current_user = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_db_session),
+    settings_service: SettingsService = Depends(get_settings_service)
 ):
     """Delete a settings profile."""
     success = await settings_service.delete_profile(profile_id, session)
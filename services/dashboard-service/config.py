@@ -1,4 +1,8 @@
-from pydantic import BaseSettings, PostgresDsn, RedisDsn, HttpUrl
+from functools import lru_cache
+from pydantic import PostgresDsn, RedisDsn, HttpUrl
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+__all__ = ["Settings", "get_settings", "settings"]
 
 class Settings(BaseSettings):
     # Database settings
@@ -19,6 +23,8 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     # Default cache TTL in seconds (60 seconds balances freshness and performance)
     DEFAULT_CACHE_TTL_SECONDS: int = 60
+    # Cache TTL in seconds for model data, which is invalidated when models change
+    MODEL_CACHE_TTL_SECONDS: int = 3600
     
     # Session settings
     # Secret key for signing session cookies (must be unique and secure)
@@ -28,9 +34,21 @@ class Settings(BaseSettings):
     # Session lifetime in seconds (1 week = 3600 * 24 * 7)
     SESSION_MAX_AGE: int = 3600 * 24 * 7
     
-    class Config:
+    # CORS settings
+    # Origin allowed to call the API from a browser (the dashboard itself by default)
+    DASHBOARD_ORIGIN: str = "http://localhost:8000"
+    
+    model_config = SettingsConfigDict(
         # Path to .env file for loading these settings
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+        env_file=".env",
+        env_file_encoding="utf-8",
+        # Settings are read-only once loaded
+        frozen=True
+    )
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the settings instance, parsing the environment only once."""
+    return Settings()
 
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
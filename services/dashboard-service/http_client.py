@@ -0,0 +1,48 @@
+import logging
+from typing import Optional
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_http_session: Optional[aiohttp.ClientSession] = None
+
+async def init_http_session(base_url: str, timeout: float = 10.0) -> aiohttp.ClientSession:
+    """
+    Create the shared HTTP session used for calls to the model service.
+    
+    Args:
+        base_url: Base URL that relative request paths are resolved against
+        timeout: Total timeout for each request in seconds
+    
+    Returns:
+        The shared session
+    """
+    global _http_session
+    
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=50, keepalive_timeout=60)
+        _http_session = aiohttp.ClientSession(
+            base_url=base_url,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        )
+        logger.info("Created shared HTTP session")
+    
+    return _http_session
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session."""
+    global _http_session
+    
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+        logger.info("Closed shared HTTP session")
+    
+    _http_session = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session instance."""
+    if _http_session is None or _http_session.closed:
+        raise RuntimeError("HTTP session has not been initialized")
+    
+    return _http_session
\ No newline at end of file
@@ -1,13 +1,19 @@
+import asyncio
 import logging
+import os
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 from config import settings
 from db import get_db_session
+from http_client import init_http_session, close_http_session
+from redis_client import get_redis_client
 from api.router import router as api_router
 from services.dashboard_service import DashboardService
+from services.settings_service import SettingsService
 
 # Configure logging
 logging.basicConfig(
@@ -16,20 +22,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger("dashboard_service")
 
+# Dashboard page, read once at startup so requests never block on disk I/O
+_index_html = b""
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources and services on startup and release them on shutdown."""
+    global _index_html
+    
+    logger.info("Starting dashboard service")
+    
+    with open("static/index.html", "rb") as f:
+        _index_html = f.read()
+    
+    # Create the shared HTTP session for model service calls
+    # Pydantic v2 URLs are not strings and carry a trailing slash
+    http_session = await init_http_session(str(settings.MODEL_SERVICE_URL).rstrip("/"))
+    
+    # Create the Redis connection pool once, before any request is served
+    redis_client = get_redis_client()
+    await redis_client.connect()
+    
+    # Build one instance of each service for the routers to inject
+    app.state.dashboard_service = DashboardService(http_session, redis_client)
+    app.state.settings_service = SettingsService(redis_client)
+    
+    # Drop cached model data as soon as the model service reports a change
+    model_events_task = asyncio.create_task(app.state.dashboard_service.listen_for_model_events())
+    
+    # Refresh model data ahead of expiry so page loads never wait on the model service
+    cache_warming_task = asyncio.create_task(app.state.dashboard_service.keep_model_caches_warm())
+    
+    logger.info("Dashboard service started")
+    
+    yield
+    
+    logger.info("Stopping dashboard service")
+    
+    for task in (model_events_task, cache_warming_task):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    
+    await close_http_session()
+    await redis_client.disconnect()
+
 # Create FastAPI app
 app = FastAPI(
     title="Stock Prediction Platform - Dashboard Service",
     description="Service for visualizing stock predictions from multiple models",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Set up CORS
+# Set up CORS with an explicit allowlist so preflight responses are static
+# and browsers can cache them for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=[settings.DASHBOARD_ORIGIN],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
 # Mount static files
@@ -41,15 +96,28 @@ app.include_router(api_router, prefix="/api")
 # Main dashboard page
 @app.get("/", response_class=HTMLResponse)
 async def root():
-    with open("static/index.html", "r") as f:
-        return f.read()
+    return HTMLResponse(_index_html)
+
+# Health check endpoint, served from a response encoded once at import
+_HEALTH_RESPONSE = ORJSONResponse({"status": "healthy"})
 
-# Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
 # Main entry point
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    
+    if os.getenv("DEV"):
+        # Auto-reload for local development
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            workers=int(os.getenv("WEB_CONCURRENCY", 2))
+        )
\ No newline at end of file
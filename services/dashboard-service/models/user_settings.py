@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, JSON, ForeignKey, DateTime, Index, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,5 +33,9 @@ class SettingsProfile(Base):
     # Relationship to user
     user = relationship("User", back_populates="profiles")
     
-    # Ensure unique profile names per user
-    __table_args__ = (UniqueConstraint('user_id', 'name', name='_user_profile_name_uc'),)
\ No newline at end of file
+    __table_args__ = (
+        # Ensure unique profile names per user (its index also serves user_id lookups)
+        UniqueConstraint('user_id', 'name', name='_user_profile_name_uc'),
+        # Find a user's active profile without touching their inactive ones
+        Index('ix_settings_profiles_user_active', 'user_id', postgresql_where=text('is_active')),
+    )
\ No newline at end of file
@@ -1,60 +1,122 @@
 import logging
-import json
 from typing import Any, Dict, List, Optional, Union
-import aioredis
+import msgpack
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline, PubSub
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+def _pack(value: Any) -> bytes:
+    """Serialize a cached value to msgpack."""
+    return msgpack.packb(value, use_bin_type=True)
+
+def _unpack(value: bytes) -> Any:
+    """Deserialize a cached msgpack value."""
+    return msgpack.unpackb(value, raw=False)
+
 class RedisClient:
     """Client for Redis caching."""
     
     def __init__(self, url: str):
         self.url = url
+        self.pool = None
         self.redis = None
     
     async def connect(self):
-        """Connect to Redis."""
+        """Create the Redis connection pool."""
+        if self.redis:
+            return
+        
         try:
-            self.redis = await aioredis.create_redis_pool(self.url)
+            self.pool = ConnectionPool.from_url(str(self.url), max_connections=50)
+            self.redis = Redis(connection_pool=self.pool)
             logger.info("Connected to Redis")
         except Exception as e:
             logger.error(f"Error connecting to Redis: {str(e)}")
+            self.pool = None
             self.redis = None
     
     async def disconnect(self):
         """Disconnect from Redis."""
         if self.redis:
-            self.redis.close()
-            await self.redis.wait_closed()
+            await self.redis.aclose()
+            await self.pool.disconnect()
+            self.redis = None
+            self.pool = None
             logger.info("Disconnected from Redis")
     
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from Redis."""
         if not self.redis:
-            await self.connect()
-            if not self.redis:
-                return None
+            return None
         
         try:
             value = await self.redis.get(key)
             if value:
-                return json.loads(value)
+                return _unpack(value)
+            return None
+        except Exception as e:
+            logger.error(f"Error getting key {key} from Redis: {str(e)}")
+            return None
+    
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get multiple values from Redis in a single round-trip."""
+        if not self.redis or not keys:
+            return [None] * len(keys)
+        
+        try:
+            values = await self.redis.mget(keys)
+            return [_unpack(value) if value else None for value in values]
+        except Exception as e:
+            logger.error(f"Error getting keys {keys} from Redis: {str(e)}")
+            return [None] * len(keys)
+    
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get an already-serialized value from Redis."""
+        if not self.redis:
             return None
+        
+        try:
+            return await self.redis.get(key)
         except Exception as e:
             logger.error(f"Error getting key {key} from Redis: {str(e)}")
             return None
     
+    async def setex_bytes(self, key: str, seconds: int, value: bytes) -> bool:
+        """Set an already-serialized value in Redis with an expiration time."""
+        if not self.redis:
+            return False
+        
+        try:
+            await self.redis.setex(key, seconds, value)
+            return True
+        except Exception as e:
+            logger.error(f"Error setting key {key} with expiration in Redis: {str(e)}")
+            return False
+    
+    def pipeline(self) -> Optional[Pipeline]:
+        """Get a non-transactional pipeline for batching commands."""
+        if not self.redis:
+            return None
+        
+        return self.redis.pipeline(transaction=False)
+    
+    def pubsub(self) -> Optional[PubSub]:
+        """Get a pub/sub handle for subscribing to channels."""
+        if not self.redis:
+            return None
+        
+        return self.redis.pubsub()
+    
     async def set(self, key: str, value: Any) -> bool:
         """Set a value in Redis."""
         if not self.redis:
-            await self.connect()
-            if not self.redis:
-                return False
+            return False
         
         try:
-            await self.redis.set(key, json.dumps(value))
+            await self.redis.set(key, _pack(value))
             return True
         except Exception as e:
             logger.error(f"Error setting key {key} in Redis: {str(e)}")
@@ -63,23 +125,34 @@ class RedisClient:
     async def setex(self, key: str, seconds: int, value: Any) -> bool:
         """Set a value in Redis with an expiration time."""
         if not self.redis:
-            await self.connect()
-            if not self.redis:
-                return False
+            return False
         
         try:
-            await self.redis.setex(key, seconds, json.dumps(value))
+            await self.redis.setex(key, seconds, _pack(value))
             return True
         except Exception as e:
             logger.error(f"Error setting key {key} with expiration in Redis: {str(e)}")
             return False
     
+    async def setex_many(self, values: Dict[str, Any], seconds: int) -> bool:
+        """Set multiple values in Redis with an expiration time in a single round-trip."""
+        if not self.redis or not values:
+            return False
+        
+        try:
+            pipe = self.pipeline()
+            for key, value in values.items():
+                pipe.setex(key, seconds, _pack(value))
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting keys {list(values)} with expiration in Redis: {str(e)}")
+            return False
+    
     async def delete(self, key: str) -> bool:
         """Delete a key from Redis."""
         if not self.redis:
-            await self.connect()
-            if not self.redis:
-                return False
+            return False
         
         try:
             await self.redis.delete(key)
@@ -88,6 +161,51 @@ class RedisClient:
             logger.error(f"Error deleting key {key} from Redis: {str(e)}")
             return False
 
+    async def delete_many(self, keys: List[str]) -> bool:
+        """Delete multiple keys from Redis in a single round-trip."""
+        if not self.redis or not keys:
+            return False
+        
+        try:
+            await self.redis.delete(*keys)
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting keys {keys} from Redis: {str(e)}")
+            return False
+    
+    async def track_keys(self, tracked: Dict[str, List[str]], seconds: int) -> bool:
+        """Record cache keys in tracking sets, so they can be invalidated without a SCAN."""
+        if not self.redis or not tracked:
+            return False
+        
+        try:
+            pipe = self.pipeline()
+            for set_key, keys in tracked.items():
+                pipe.sadd(set_key, *keys)
+                # Outlive the newest tracked entry; members that expire first are harmless to delete
+                pipe.expire(set_key, seconds)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error tracking keys in {list(tracked)} in Redis: {str(e)}")
+            return False
+    
+    async def pop_tracked_keys(self, set_keys: List[str]) -> List[str]:
+        """Get every key recorded in the tracking sets and drop the sets in a single transaction."""
+        if not self.redis or not set_keys:
+            return []
+        
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            for set_key in set_keys:
+                pipe.smembers(set_key)
+            pipe.delete(*set_keys)
+            *members, _ = await pipe.execute()
+            return [key.decode() for keys in members for key in keys]
+        except Exception as e:
+            logger.error(f"Error reading tracked keys from {set_keys} in Redis: {str(e)}")
+            return []
+
 _redis_client = None
 
 def get_redis_client() -> RedisClient:
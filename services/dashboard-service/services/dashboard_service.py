@@ -1,59 +1,121 @@
+import asyncio
 import logging
-import httpx
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import aiohttp
+import orjson
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple
+from redis.exceptions import RedisError
+from datetime import date, datetime, time, timedelta
 
 from config import settings
-from redis_client import get_redis_client
+from redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
+# Redis pub/sub channel the model service publishes model changes on
+MODEL_EVENTS_CHANNEL = "model.events"
+
+def comparison_keys_set(stock_id: int, model_id: Optional[int] = None) -> str:
+    """
+    Name the Redis set tracking a stock's cached comparison keys.
+    
+    Per-model comparison entries are tracked per stock and model, route responses
+    (which may span several models) per stock.
+    """
+    if model_id is None:
+        return f"comparison_keys:{stock_id}"
+    return f"comparison_keys:{stock_id}:{model_id}"
+
+def model_comparison_keys_set(model_id: int) -> str:
+    """Name the Redis set tracking every cached comparison key that includes a model."""
+    return f"model_comparison_keys:{model_id}"
+
 class DashboardService:
     """Service for retrieving data for the dashboard."""
     
-    def __init__(self):
-        self.redis_client = get_redis_client()
-        self.model_service_url = settings.MODEL_SERVICE_URL
+    def __init__(self, http_session: aiohttp.ClientSession, redis_client: RedisClient):
+        self.http_session = http_session
+        self.redis_client = redis_client
+        # Model service requests currently running, keyed by what they fetch
+        self._inflight: Dict[str, asyncio.Task] = {}
     
     async def get_stocks(self) -> List[Dict[str, Any]]:
         """Get list of stocks."""
-        # Create HTTP client
-        async with httpx.AsyncClient() as client:
-            try:
-                # Get stocks from the data ingestion service
-                response = await client.get(f"{settings.MODEL_SERVICE_URL}/api/stocks")
+        session = self.http_session
+        try:
+            # Get stocks from the data ingestion service
+            async with session.get("/api/stocks") as response:
                 response.raise_for_status()
                 
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Error getting stocks: {str(e)}")
-                return []
+                return await response.json(loads=orjson.loads)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error getting stocks: {str(e)}")
+            return []
     
-    async def get_models(self) -> List[Dict[str, Any]]:
-        """Get list of models."""
+    async def get_models(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Get list of models, bypassing the cache read when force_refresh is set."""
         # Try to get from cache first
-        cached_models = await self.redis_client.get("models")
-        if cached_models:
-            return cached_models
+        if not force_refresh:
+            cached_models = await self.redis_client.get("models")
+            if cached_models:
+                return cached_models
         
         # If not in cache, get from model service
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{settings.MODEL_SERVICE_URL}/api/models")
-                response.raise_for_status()
-                
-                models = response.json()
-                
-                # Cache for future requests
-                await self.redis_client.setex("models", settings.DEFAULT_CACHE_TTL_SECONDS, models)
-                
-                return models
-            except httpx.RequestError as e:
-                logger.error(f"Error getting models: {str(e)}")
-                return []
+        try:
+            models = await self._fetch_models()
+            
+            # Cache for future requests
+            await self.redis_client.setex("models", settings.MODEL_CACHE_TTL_SECONDS, models)
+            
+            return models
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error getting models: {str(e)}")
+            return []
+    
+    async def _fetch_models(self) -> List[Dict[str, Any]]:
+        """Get list of models from the model service."""
+        return await self._single_flight("models", lambda: self._get_json("/api/models"))
+    
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Make a GET request to the model service and decode the JSON response."""
+        async with self.http_session.get(path, params=params) as response:
+            response.raise_for_status()
+            
+            return await response.json(loads=orjson.loads)
+    
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Share one in-flight fetch between concurrent callers asking for the same key.
+        
+        Args:
+            key: Identifies what is being fetched
+            fetch: Starts the fetch when no request for the key is running
+        
+        Returns:
+            The fetched value, or raises the fetch's exception
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one caller being cancelled does not cancel the others' fetch
+        return await asyncio.shield(task)
+    
+    @staticmethod
+    def default_comparison_window() -> Tuple[datetime, datetime]:
+        """
+        Get the default comparison date range, rounded to whole days.
+        
+        Returns:
+            Tuple of (start, end): midnight 30 days ago to the end of the day 5 days ahead,
+            so default requests share the same cache and single-flight keys all day
+        """
+        today = datetime.combine(date.today(), time.min)
+        return today - timedelta(days=30), today + timedelta(days=6)
     
     async def get_prediction_comparison(
-        self, 
+        self,
         stock_id: int,
         model_ids: List[int],
         start_date: Optional[datetime] = None,
@@ -61,106 +123,328 @@ class DashboardService:
     ) -> Dict[str, Any]:
         """Get comparison data for multiple models for a specific stock."""
         # Set default dates if not provided
-        if not start_date:
-            start_date = datetime.now() - timedelta(days=30)
+        default_start, default_end = self.default_comparison_window()
+        start_date = start_date or default_start
+        end_date = end_date or default_end
         
-        if not end_date:
-            end_date = datetime.now() + timedelta(days=5)
+        # Fan out once per distinct model, keeping the requested order
+        model_ids = list(dict.fromkeys(model_ids))
         
-        # Create HTTP client
-        async with httpx.AsyncClient() as client:
-            try:
-                # Prepare query params
-                params = {
-                    "stock_id": stock_id,
-                    "model_ids": model_ids,
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat()
-                }
-                
-                # Make request to model service
-                response = await client.get(
-                    f"{settings.MODEL_SERVICE_URL}/api/predictions/comparison",
-                    params=params
-                )
-                response.raise_for_status()
-                
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Error getting prediction comparison: {str(e)}")
-                return {"error": str(e)}
+        # Look up every model's cached comparison in a single round-trip
+        cache_keys = [
+            f"pred:{stock_id}:{model_id}:{start_date.isoformat()}:{end_date.isoformat()}"
+            for model_id in model_ids
+        ]
+        cached_results = await self.redis_client.mget(cache_keys)
+        
+        comparisons = [result for result in cached_results if result is not None]
+        missing = [
+            (model_id, cache_key)
+            for model_id, cache_key, result in zip(model_ids, cache_keys, cached_results)
+            if result is None
+        ]
+        
+        # Request the remaining models concurrently so latency tracks the slowest call
+        results = await asyncio.gather(
+            *[
+                self._get_model_comparison(stock_id, model_id, start_date, end_date)
+                for model_id, _ in missing
+            ],
+            return_exceptions=True
+        )
+        
+        errors = []
+        fetched = {}
+        for (model_id, cache_key), result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error getting prediction comparison for model {model_id}: {str(result)}")
+                errors.append(str(result))
+            else:
+                comparisons.append(result)
+                fetched[cache_key] = result
+        
+        # Cache the fetched comparisons for future requests, tracking them for invalidation
+        if fetched:
+            await self.redis_client.setex_many(fetched, settings.DEFAULT_CACHE_TTL_SECONDS)
+            
+            tracked: Dict[str, List[str]] = {}
+            for model_id, cache_key in missing:
+                if cache_key in fetched:
+                    tracked.setdefault(comparison_keys_set(stock_id, model_id), []).append(cache_key)
+                    tracked.setdefault(model_comparison_keys_set(model_id), []).append(cache_key)
+            await self.redis_client.track_keys(tracked, settings.DEFAULT_CACHE_TTL_SECONDS)
+        
+        if not comparisons:
+            return {"error": errors[0] if errors else "No models requested"}
+        
+        return self._merge_comparisons(comparisons)
+    
+    async def _get_model_comparison(
+        self,
+        stock_id: int,
+        model_id: int,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, Any]:
+        """Get comparison data for a single model from the model service."""
+        # Prepare query params
+        params = {
+            "stock_id": stock_id,
+            "model_ids": model_id,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
+        }
+        
+        # Make request to model service
+        return await self._single_flight(
+            f"comparison:{stock_id}:{model_id}:{params['start_date']}:{params['end_date']}",
+            lambda: self._get_json("/api/predictions/comparison", params)
+        )
     
-    async def get_feature_importance(self, model_id: int) -> Dict[str, Any]:
-        """Get feature importance for a model."""
+    @staticmethod
+    def _merge_comparisons(comparisons: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge per-model comparison responses into a single response."""
+        merged = {
+            "stock_id": comparisons[0]["stock_id"],
+            "start_date": comparisons[0]["start_date"],
+            "end_date": comparisons[0]["end_date"],
+            "comparison_data": [],
+            "metrics": {}
+        }
+        
+        # Index data points by date so predictions from every model line up
+        data_points = {}
+        for comparison in comparisons:
+            for point in comparison.get("comparison_data", []):
+                existing = data_points.get(point["date"])
+                if existing is None:
+                    data_points[point["date"]] = {
+                        "date": point["date"],
+                        "actual": point["actual"],
+                        "predictions": dict(point["predictions"])
+                    }
+                else:
+                    existing["predictions"].update(point["predictions"])
+            
+            merged["metrics"].update(comparison.get("metrics", {}))
+        
+        merged["comparison_data"] = sorted(data_points.values(), key=lambda point: point["date"])
+        
+        return merged
+    
+    async def get_feature_importance(self, model_id: int, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get feature importance for a model, bypassing the cache read when force_refresh is set."""
         # Try to get from cache first
         cache_key = f"feature_importance:{model_id}"
-        cached_data = await self.redis_client.get(cache_key)
-        if cached_data:
-            return cached_data
+        if not force_refresh:
+            cached_data = await self.redis_client.get(cache_key)
+            if cached_data:
+                return cached_data
         
         # If not in cache, get from model service
-        async with httpx.AsyncClient() as client:
+        try:
+            feature_importance = await self._fetch_feature_importance(model_id)
+            
+            # Cache for future requests
+            await self.redis_client.setex(
+                cache_key,
+                settings.MODEL_CACHE_TTL_SECONDS,
+                feature_importance
+            )
+            
+            return feature_importance
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error getting feature importance: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _fetch_feature_importance(self, model_id: int) -> Dict[str, Any]:
+        """Get feature importance for a model from the model service."""
+        return await self._single_flight(
+            f"feature_importance:{model_id}",
+            lambda: self._get_json(f"/api/models/{model_id}/feature_importance")
+        )
+    
+    async def get_dashboard_bundle(
+        self,
+        stock_id: int,
+        model_ids: List[int]
+    ) -> Dict[str, Any]:
+        """Get everything a dashboard page needs for a stock and a set of models."""
+        # Read every cached entry in a single round-trip
+        feature_keys = [f"feature_importance:{model_id}" for model_id in model_ids]
+        cached_models, *cached_features = await self.redis_client.mget(["models", *feature_keys])
+        
+        missing_features = [
+            model_id
+            for model_id, cached_data in zip(model_ids, cached_features)
+            if cached_data is None
+        ]
+        
+        # Fetch the misses and the comparison concurrently; the comparison uses the
+        # day-rounded default window so its per-model entries are served from cache
+        fetch_models = cached_models is None
+        start_date, end_date = self.default_comparison_window()
+        comparison, *results = await asyncio.gather(
+            self.get_prediction_comparison(stock_id, model_ids, start_date, end_date),
+            *[self._fetch_feature_importance(model_id) for model_id in missing_features],
+            *([self._fetch_models()] if fetch_models else []),
+            return_exceptions=True
+        )
+        feature_results = results[:len(missing_features)]
+        
+        if isinstance(comparison, Exception):
+            logger.error(f"Error getting prediction comparison: {str(comparison)}")
+            comparison = {"error": str(comparison)}
+        
+        fetched = {}
+        
+        models = cached_models
+        if fetch_models:
+            models_result = results[-1]
+            if isinstance(models_result, Exception):
+                logger.error(f"Error getting models: {str(models_result)}")
+                models = []
+            else:
+                models = models_result
+                fetched["models"] = models
+        
+        feature_importance = dict(zip(model_ids, cached_features))
+        for model_id, result in zip(missing_features, feature_results):
+            if isinstance(result, Exception):
+                logger.error(f"Error getting feature importance for model {model_id}: {str(result)}")
+                feature_importance[model_id] = {"error": str(result)}
+            else:
+                feature_importance[model_id] = result
+                fetched[f"feature_importance:{model_id}"] = result
+        
+        # Write the fetched entries back in a single round-trip
+        if fetched:
+            await self.redis_client.setex_many(fetched, settings.MODEL_CACHE_TTL_SECONDS)
+        
+        return {
+            "models": models,
+            "feature_importance": feature_importance,
+            "comparison": comparison
+        }
+    
+    async def invalidate(self, keys: List[str]) -> None:
+        """Delete cached entries in a single DEL."""
+        await self.redis_client.delete_many(keys)
+    
+    async def invalidate_model(self, model_id: int) -> None:
+        """Delete every cached entry derived from a model."""
+        # Service-level entries, plus the route responses cached by api.cache; comparisons
+        # including the model come from its tracking set rather than a keyspace SCAN
+        comparison_keys = await self.redis_client.pop_tracked_keys([model_comparison_keys_set(model_id)])
+        await self.invalidate([
+            "models",
+            f"feature_importance:{model_id}",
+            "response:get_models:",
+            f"response:get_feature_importance:model_id={model_id}",
+            f"response:get_model_metrics:model_id={model_id}",
+            *comparison_keys
+        ])
+    
+    async def refresh_model_caches(self) -> None:
+        """Re-fetch and re-cache the models list and every model's feature importance."""
+        models = await self.get_models(force_refresh=True)
+        
+        await asyncio.gather(
+            *[self.get_feature_importance(model["id"], force_refresh=True) for model in models]
+        )
+    
+    async def keep_model_caches_warm(self) -> None:
+        """Refresh the model caches shortly before they expire so reads always hit."""
+        interval = max(settings.MODEL_CACHE_TTL_SECONDS - 30, 30)
+        
+        while True:
             try:
-                response = await client.get(
-                    f"{settings.MODEL_SERVICE_URL}/api/models/{model_id}/feature_importance"
-                )
-                response.raise_for_status()
-                
-                feature_importance = response.json()
-                
-                # Cache for future requests
-                await self.redis_client.setex(
-                    cache_key, 
-                    settings.DEFAULT_CACHE_TTL_SECONDS, 
-                    feature_importance
-                )
-                
-                return feature_importance
-            except httpx.RequestError as e:
-                logger.error(f"Error getting feature importance: {str(e)}")
-                return {"error": str(e)}
+                await self.refresh_model_caches()
+            except Exception as e:
+                logger.error(f"Error refreshing model caches: {str(e)}")
+            
+            await asyncio.sleep(interval)
+    
+    async def listen_for_model_events(self) -> None:
+        """Invalidate cached model data whenever the model service reports a change."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            if pubsub is None:
+                logger.warning("Redis is not connected, model events will not invalidate caches")
+                return
+            
+            try:
+                await pubsub.subscribe(MODEL_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    
+                    try:
+                        event = orjson.loads(message["data"])
+                        await self.invalidate_model(event["model_id"])
+                    except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                        logger.error(f"Error handling model event: {str(e)}")
+            except RedisError as e:
+                logger.error(f"Error listening for model events: {str(e)}")
+            finally:
+                await pubsub.aclose()
+            
+            # Resubscribe after a connection failure
+            await asyncio.sleep(1)
     
     async def generate_prediction(
-        self, 
+        self,
         model_id: int,
         stock_id: int
     ) -> Dict[str, Any]:
         """Generate a new prediction for a stock using a model."""
-        async with httpx.AsyncClient() as client:
-            try:
-                # Prepare request data
-                data = {
-                    "model_id": model_id,
-                    "stock_id": stock_id,
-                    "save_to_db": True
-                }
-                
-                # Make request to model service
-                response = await client.post(
-                    f"{settings.MODEL_SERVICE_URL}/api/predictions",
-                    json=data
-                )
+        session = self.http_session
+        try:
+            # Prepare request data
+            data = {
+                "model_id": model_id,
+                "stock_id": stock_id,
+                "save_to_db": True
+            }
+            
+            # Make request to model service
+            async with session.post(
+                "/api/predictions",
+                json=data
+            ) as response:
                 response.raise_for_status()
                 
-                # Invalidate cache for comparison data
-                cache_key = f"comparison:{stock_id}"
-                await self.redis_client.delete(cache_key)
-                
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Error generating prediction: {str(e)}")
-                return {"error": str(e)}
+                prediction = await response.json(loads=orjson.loads)
+            
+            # Invalidate the model's cached data and the stock's cached comparisons; the
+            # comparison keys come from their tracking sets rather than a keyspace SCAN
+            comparison_keys = await self.redis_client.pop_tracked_keys([
+                comparison_keys_set(stock_id, model_id),
+                comparison_keys_set(stock_id)
+            ])
+            await self.invalidate([
+                "models",
+                f"feature_importance:{model_id}",
+                "response:get_models:",
+                f"response:get_feature_importance:model_id={model_id}",
+                *comparison_keys
+            ])
+            
+            return prediction
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error generating prediction: {str(e)}")
+            return {"error": str(e)}
     
     async def get_model_metrics(self, model_id: int) -> Dict[str, Any]:
         """Get performance metrics for a model."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{settings.MODEL_SERVICE_URL}/api/models/{model_id}/metrics"
-                )
+        session = self.http_session
+        try:
+            async with session.get(
+                f"/api/models/{model_id}/metrics"
+            ) as response:
                 response.raise_for_status()
                 
-                return response.json()
-            except httpx.RequestError as e:
-                logger.error(f"Error getting model metrics: {str(e)}")
-                return {"error": str(e)}
\ No newline at end of file
+                return await response.json(loads=orjson.loads)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error getting model metrics: {str(e)}")
+            return {"error": str(e)}
\ No newline at end of file
@@ -1,16 +1,18 @@
+import copy
 import logging
-import json
+from types import MappingProxyType
 from typing import Dict, List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete
 
 from models.user_settings import User, SettingsProfile
+from redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
-# Default settings for new users
-DEFAULT_SETTINGS = {
+# Default settings for new users (read-only; copy before storing in a profile)
+DEFAULT_SETTINGS = MappingProxyType({
     # Data Ingestion Settings
     "data_fetch_interval_minutes": 15,  # How often to fetch new data (minutes)
     "historical_data_days": 730,        # Initial historical data to load (days)
@@ -34,49 +36,73 @@ DEFAULT_SETTINGS = {
     "price_alert_threshold": 5.0,      # Alert threshold percentage
     "enable_prediction_alerts": True,  # Enable prediction accuracy alerts
     "prediction_alert_threshold": 10.0 # Alert threshold percentage
-}
+})
+
+# Safety-net expiry for cached active profiles, which are invalidated on every write
+ACTIVE_PROFILE_CACHE_TTL_SECONDS = 3600
+
+# Columns returned for a profile, selected directly to skip ORM hydration
+_PROFILE_COLUMNS = (
+    SettingsProfile.id,
+    SettingsProfile.name,
+    SettingsProfile.is_active,
+    SettingsProfile.settings,
+    SettingsProfile.created_at,
+    SettingsProfile.updated_at,
+)
+
+def _serialize_row(row) -> Dict:
+    """Convert a profile row (or ORM instance) into its API representation."""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "is_active": row.is_active,
+        "settings": row.settings,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat()
+    }
+
+def _active_profile_cache_key(user_id: int) -> str:
+    """Build the cache key for a user's active profile."""
+    return f"active_profile:{user_id}"
 
 class SettingsService:
     """Service for managing user settings profiles."""
     
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+    
     async def get_user_profiles(self, user_id: int, session: AsyncSession) -> List[Dict]:
         """Get all settings profiles for a user."""
-        query = select(SettingsProfile).where(SettingsProfile.user_id == user_id)
+        query = select(*_PROFILE_COLUMNS).where(SettingsProfile.user_id == user_id)
         result = await session.execute(query)
-        profiles = result.scalars().all()
-        
-        return [
-            {
-                "id": profile.id,
-                "name": profile.name,
-                "is_active": profile.is_active,
-                "settings": profile.settings,
-                "created_at": profile.created_at.isoformat(),
-                "updated_at": profile.updated_at.isoformat()
-            }
-            for profile in profiles
-        ]
+        
+        return [_serialize_row(row) for row in result.all()]
     
     async def get_active_profile(self, user_id: int, session: AsyncSession) -> Optional[Dict]:
         """Get the active settings profile for a user."""
-        query = select(SettingsProfile).where(
+        # Try to get from cache first
+        cache_key = _active_profile_cache_key(user_id)
+        cached_profile = await self.redis_client.get(cache_key)
+        if cached_profile:
+            return cached_profile
+        
+        query = select(*_PROFILE_COLUMNS).where(
             SettingsProfile.user_id == user_id,
             SettingsProfile.is_active == True
         )
         result = await session.execute(query)
-        profile = result.scalars().first()
+        row = result.first()
         
-        if not profile:
+        if not row:
             return None
         
-        return {
-            "id": profile.id,
-            "name": profile.name,
-            "is_active": profile.is_active,
-            "settings": profile.settings,
-            "created_at": profile.created_at.isoformat(),
-            "updated_at": profile.updated_at.isoformat()
-        }
+        profile = _serialize_row(row)
+        
+        # Cache for future requests
+        await self.redis_client.setex(cache_key, ACTIVE_PROFILE_CACHE_TTL_SECONDS, profile)
+        
+        return profile
     
     async def create_profile(
         self,
@@ -84,33 +110,30 @@ class SettingsService:
         name: str,
         settings: Dict,
         is_active: bool = False,
+        *,
         session: AsyncSession
     ) -> Dict:
         """Create a new settings profile for a user."""
-        # If this profile is active, deactivate all others
-        if is_active:
-            await self._deactivate_all_profiles(user_id, session)
-        
-        # Create new profile
-        profile = SettingsProfile(
+        # Insert the profile, returning everything the response needs
+        query = insert(SettingsProfile).values(
             user_id=user_id,
             name=name,
             settings=settings,
             is_active=is_active
-        )
+        ).returning(*_PROFILE_COLUMNS)
+        result = await session.execute(query)
+        row = result.one()
+        
+        # If this profile is active, deactivate all others in the same transaction
+        if is_active:
+            await self._deactivate_all_profiles(user_id, session, except_profile_id=row.id)
         
-        session.add(profile)
         await session.commit()
-        await session.refresh(profile)
-        
-        return {
-            "id": profile.id,
-            "name": profile.name,
-            "is_active": profile.is_active,
-            "settings": profile.settings,
-            "created_at": profile.created_at.isoformat(),
-            "updated_at": profile.updated_at.isoformat()
-        }
+        
+        if is_active:
+            await self._invalidate_active_profile(user_id)
+        
+        return _serialize_row(row)
     
     async def update_profile(
         self,
@@ -118,153 +141,128 @@ class SettingsService:
         name: Optional[str] = None,
         settings: Optional[Dict] = None,
         is_active: Optional[bool] = None,
+        *,
         session: AsyncSession
     ) -> Optional[Dict]:
         """Update an existing settings profile."""
-        # Get profile
-        query = select(SettingsProfile).where(SettingsProfile.id == profile_id)
-        result = await session.execute(query)
-        profile = result.scalars().first()
-        
-        if not profile:
-            return None
+        values = {"updated_at": datetime.utcnow()}
         
-        # If activating this profile, deactivate all others
-        if is_active:
-            await self._deactivate_all_profiles(profile.user_id, session)
-        
-        # Update profile
         if name is not None:
-            profile.name = name
+            values["name"] = name
         
         if settings is not None:
-            profile.settings = settings
+            values["settings"] = settings
         
         if is_active is not None:
-            profile.is_active = is_active
+            values["is_active"] = is_active
         
-        profile.updated_at = datetime.utcnow()
+        # Update and read back the profile in a single statement
+        query = update(SettingsProfile).where(
+            SettingsProfile.id == profile_id
+        ).values(**values).returning(SettingsProfile.user_id, *_PROFILE_COLUMNS)
+        result = await session.execute(query)
+        row = result.first()
+        
+        if not row:
+            return None
+        
+        # If activating this profile, deactivate all others
+        if is_active:
+            await self._deactivate_all_profiles(row.user_id, session, except_profile_id=row.id)
         
         await session.commit()
-        await session.refresh(profile)
-        
-        return {
-            "id": profile.id,
-            "name": profile.name,
-            "is_active": profile.is_active,
-            "settings": profile.settings,
-            "created_at": profile.created_at.isoformat(),
-            "updated_at": profile.updated_at.isoformat()
-        }
+        await self._invalidate_active_profile(row.user_id)
+        
+        return _serialize_row(row)
     
     async def delete_profile(self, profile_id: int, session: AsyncSession) -> bool:
         """Delete a settings profile."""
-        # Get profile
-        query = select(SettingsProfile).where(SettingsProfile.id == profile_id)
+        query = delete(SettingsProfile).where(
+            SettingsProfile.id == profile_id
+        ).returning(SettingsProfile.user_id, SettingsProfile.is_active)
         result = await session.execute(query)
-        profile = result.scalars().first()
+        row = result.first()
         
-        if not profile:
+        if not row:
             return False
         
-        # If this is the active profile, we need to set another one as active
-        should_set_new_active = profile.is_active
-        user_id = profile.user_id
+        # If this was the active profile, set another one as active
+        if row.is_active:
+            await self._set_new_active_profile(row.user_id, session)
         
-        # Delete profile
-        await session.delete(profile)
         await session.commit()
         
-        # If this was the active profile, set another one as active
-        if should_set_new_active:
-            await self._set_new_active_profile(user_id, session)
+        if row.is_active:
+            await self._invalidate_active_profile(row.user_id)
         
         return True
     
-    async def _deactivate_all_profiles(self, user_id: int, session: AsyncSession) -> None:
-        """Deactivate all profiles for a user."""
+    async def _invalidate_active_profile(self, user_id: int) -> None:
+        """Drop a user's cached active profile after it may have changed."""
+        await self.redis_client.delete(_active_profile_cache_key(user_id))
+    
+    async def _deactivate_all_profiles(
+        self,
+        user_id: int,
+        session: AsyncSession,
+        except_profile_id: Optional[int] = None
+    ) -> None:
+        """Deactivate all profiles for a user, optionally sparing one."""
         query = update(SettingsProfile).where(
             SettingsProfile.user_id == user_id
         ).values(is_active=False)
         
+        if except_profile_id is not None:
+            query = query.where(SettingsProfile.id != except_profile_id)
+        
         await session.execute(query)
     
     async def _set_new_active_profile(self, user_id: int, session: AsyncSession) -> None:
         """Set a new active profile for a user after the active one is deleted."""
-        # Get all profiles for the user
-        query = select(SettingsProfile).where(SettingsProfile.user_id == user_id)
-        result = await session.execute(query)
-        profiles = result.scalars().all()
+        row = await self._activate_first_profile(user_id, session)
         
-        if not profiles:
+        if not row:
             # Create a default profile if none exist
-            default_profile = SettingsProfile(
-                user_id=user_id,
-                name="Default",
-                settings=DEFAULT_SETTINGS,
-                is_active=True
-            )
-            
-            session.add(default_profile)
-            await session.commit()
-            return
-        
-        # Set the first profile as active
-        profiles[0].is_active = True
-        await session.commit()
+            await self._create_default_profile(user_id, session)
+    
+    async def _activate_first_profile(self, user_id: int, session: AsyncSession):
+        """Activate a user's lowest-id profile, returning it or None if the user has none."""
+        first_profile_id = select(SettingsProfile.id).where(
+            SettingsProfile.user_id == user_id
+        ).order_by(SettingsProfile.id).limit(1).scalar_subquery()
+        
+        query = update(SettingsProfile).where(
+            SettingsProfile.id == first_profile_id
+        ).values(is_active=True).returning(*_PROFILE_COLUMNS)
+        result = await session.execute(query)
+        
+        return result.first()
+    
+    async def _create_default_profile(self, user_id: int, session: AsyncSession):
+        """Create an active default profile for a user, returning it."""
+        query = insert(SettingsProfile).values(
+            user_id=user_id,
+            name="Default",
+            settings=copy.deepcopy(dict(DEFAULT_SETTINGS)),
+            is_active=True
+        ).returning(*_PROFILE_COLUMNS)
+        result = await session.execute(query)
+        
+        return result.one()
     
     async def ensure_default_profile(self, user_id: int, session: AsyncSession) -> Dict:
         """Ensure that a user has at least a default profile."""
-        # Check if user has any profiles
-        query = select(SettingsProfile).where(SettingsProfile.user_id == user_id)
-        result = await session.execute(query)
-        profiles = result.scalars().all()
-        
-        if not profiles:
-            # Create default profile
-            default_profile = SettingsProfile(
-                user_id=user_id,
-                name="Default",
-                settings=DEFAULT_SETTINGS,
-                is_active=True
-            )
-            
-            session.add(default_profile)
-            await session.commit()
-            await session.refresh(default_profile)
-            
-            return {
-                "id": default_profile.id,
-                "name": default_profile.name,
-                "is_active": default_profile.is_active,
-                "settings": default_profile.settings,
-                "created_at": default_profile.created_at.isoformat(),
-                "updated_at": default_profile.updated_at.isoformat()
-            }
-        
-        # Check if any profile is active
-        active_profile = next((p for p in profiles if p.is_active), None)
-        
-        if not active_profile:
-            # Set the first profile as active
-            profiles[0].is_active = True
-            await session.commit()
-            await session.refresh(profiles[0])
-            
-            return {
-                "id": profiles[0].id,
-                "name": profiles[0].name,
-                "is_active": profiles[0].is_active,
-                "settings": profiles[0].settings,
-                "created_at": profiles[0].created_at.isoformat(),
-                "updated_at": profiles[0].updated_at.isoformat()
-            }
-        
-        return {
-            "id": active_profile.id,
-            "name": active_profile.name,
-            "is_active": active_profile.is_active,
-            "settings": active_profile.settings,
-            "created_at": active_profile.created_at.isoformat(),
-            "updated_at": active_profile.updated_at.isoformat()
-        }
\ No newline at end of file
+        # Use the active profile if there is one
+        active_profile = await self.get_active_profile(user_id, session)
+        if active_profile:
+            return active_profile
+        
+        # Otherwise activate the first profile, creating a default one if none exist
+        row = await self._activate_first_profile(user_id, session)
+        if not row:
+            row = await self._create_default_profile(user_id, session)
+        
+        await session.commit()
+        await self._invalidate_active_profile(user_id)
+        
+        return _serialize_row(row)
\ No newline at end of file
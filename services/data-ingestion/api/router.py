@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from db import get_db_session
 from services.stock_data_service import StockDataService
 from services.feature_engineering_service import FeatureEngineeringService
-from tasks.data_ingestion_tasks import import_historical_data_for_all_stocks
+from tasks.data_ingestion_tasks import enqueue_historical_import
 from models.api import (
     StockCreate, 
     StockResponse, 
@@ -45,14 +45,14 @@ async def import_index(request: ImportIndexRequest):
     return await stock_service.import_market_index(request.source)
 
 @router.post("/data/import_historical")
-async def import_historical_data(request: ImportDataRequest, stock_id: int = None):
+async def import_historical_data(request: ImportDataRequest, stock_id: Optional[int] = None):
     """Import historical data for a stock or all stocks."""
     if stock_id:
         return await stock_service.import_historical_data(stock_id, request.days)
     else:
-        # Run in background task
-        background_tasks.add_task(import_historical_data_for_all_stocks)
-        return {"message": "Historical data import started in the background"}
+        # Hand off to the import worker so the request returns immediately
+        job_id = enqueue_historical_import()
+        return {"message": "Historical data import queued", "job_id": job_id}
 
 @router.post("/data/enable_realtime")
 async def enable_realtime_data(request: EnableRealtimeRequest):
@@ -1,5 +1,6 @@
-import os
-from pydantic import BaseSettings, PostgresDsn, RedisDsn
+from functools import lru_cache
+from pydantic import PostgresDsn, RedisDsn
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     # Database settings
@@ -21,11 +22,11 @@ class Settings(BaseSettings):
     
     # API settings - keys for external data providers
     # Alpha Vantage API key for stock data (register at alphavantage.co)
-    API_KEY_ALPHA_VANTAGE: str = os.getenv("API_KEY_ALPHA_VANTAGE", "")
+    API_KEY_ALPHA_VANTAGE: str = ""
     # Finnhub API key for additional market data (register at finnhub.io)
-    API_KEY_FINNHUB: str = os.getenv("API_KEY_FINNHUB", "")
+    API_KEY_FINNHUB: str = ""
     # Polygon.io API key for market data (register at polygon.io)
-    API_KEY_POLYGON: str = os.getenv("API_KEY_POLYGON", "")
+    API_KEY_POLYGON: str = ""
     
     # Data ingestion settings
     # Number of records to process in a single batch (1000 is a good balance)
@@ -34,15 +35,25 @@ class Settings(BaseSettings):
     DATA_FETCH_INTERVAL_MINUTES: int = 15
     # Number of days of historical data to load (730 days = 2 years is recommended)
     HISTORICAL_DATA_DAYS: int = 365 * 2
+    # Number of stocks imported concurrently (requests are still gated by the rate limit)
+    DATA_IMPORT_CONCURRENCY: int = 5
+    # Alpha Vantage requests allowed per minute (5 on the free tier)
+    ALPHA_VANTAGE_REQUESTS_PER_MINUTE: int = 5
     
     # Feature engineering settings
     # Time intervals in days for calculating technical indicators like moving averages
     # Common values include 5 (week), 20 (month), 50, 100, 200 (long-term trends)
     FEATURE_CALCULATION_INTERVALS: list[int] = [5, 10, 20, 50, 100, 200]
     
-    class Config:
+    model_config = SettingsConfigDict(
         # Path to .env file for loading these settings
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+        env_file=".env",
+        env_file_encoding="utf-8"
+    )
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the settings instance, parsing the environment only once."""
+    return Settings()
+
+settings = get_settings()
\ No newline at end of file
@@ -1,14 +1,17 @@
 import asyncio
 import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db import get_db_session
 from config import settings
 from services.stock_data_service import StockDataService
-from services.feature_engineering_service import FeatureEngineeringService
+from services.feature_engineering_service import FeatureEngineeringService, warm_up_feature_executor, shutdown_feature_executor
 from api.router import router as api_router
-from tasks.data_ingestion_tasks import start_scheduled_data_ingestion
+from tasks.data_ingestion_tasks import start_scheduled_data_ingestion, run_historical_import_worker
 
 # Configure logging
 logging.basicConfig(
@@ -17,32 +20,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger("data_ingestion")
 
+# Delay before restarting the ingestion scheduler after it stops unexpectedly
+INGESTION_RESTART_DELAY_SECONDS = 60
+
+async def supervise_data_ingestion():
+    """Run the scheduled data ingestion, restarting it whenever it stops."""
+    while True:
+        try:
+            await start_scheduled_data_ingestion()
+            logger.error("Scheduled data ingestion stopped unexpectedly")
+        except Exception as e:
+            logger.exception("Scheduled data ingestion crashed: %s", e)
+        
+        logger.info("Restarting scheduled data ingestion in %s seconds", INGESTION_RESTART_DELAY_SECONDS)
+        await asyncio.sleep(INGESTION_RESTART_DELAY_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background ingestion workers for the lifetime of the app."""
+    logger.info("Starting data ingestion service")
+    
+    # Compile the feature kernels in every worker before the first ingestion run needs them
+    await warm_up_feature_executor()
+    
+    # The task group owns the background workers, so they are always awaited on shutdown
+    async with asyncio.TaskGroup() as task_group:
+        app.state.ingestion_task = task_group.create_task(
+            supervise_data_ingestion(), name="ingestion"
+        )
+        app.state.historical_import_task = task_group.create_task(
+            run_historical_import_worker(), name="historical-import"
+        )
+        
+        logger.info("Data ingestion service started")
+        
+        yield
+        
+        logger.info("Stopping data ingestion service")
+        app.state.ingestion_task.cancel()
+        app.state.historical_import_task.cancel()
+    
+    shutdown_feature_executor()
+
 # Create FastAPI app
 app = FastAPI(
     title="Stock Prediction Platform - Data Ingestion Service",
     description="Service for ingesting and processing stock data",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Include API router
 app.include_router(api_router, prefix="/api")
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting data ingestion service")
-    
-    # Start scheduled data ingestion tasks
-    asyncio.create_task(start_scheduled_data_ingestion())
-    
-    logger.info("Data ingestion service started")
+# Health check endpoint, served from a response encoded once at import
+_HEALTH_RESPONSE = ORJSONResponse({"status": "healthy"})
 
-# Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
 # Main entry point
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    
+    if os.getenv("DEV"):
+        # Auto-reload for local development
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # A single worker, since each worker would run its own scheduled ingestion
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop")
\ No newline at end of file
@@ -1,10 +1,16 @@
 import aiohttp
 import asyncio
+import csv
+import io
 import logging
+import orjson
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+from urllib.parse import urlencode
+from yarl import URL
 
-from .base_provider import BaseDataProvider
+from .base_provider import BaseDataProvider, PriceRow
+from .rate_limiter import SlidingWindowRateLimiter
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -13,50 +19,72 @@ class AlphaVantageProvider(BaseDataProvider):
     """Data provider implementation for Alpha Vantage API."""
     
     BASE_URL = "https://www.alphavantage.co/query"
+    # outputsize=compact returns the latest 100 trading days, which always spans at least 100 calendar days
+    COMPACT_OUTPUT_DAYS = 100
     
     def __init__(self, api_key: Optional[str] = None):
         super().__init__(api_key or settings.API_KEY_ALPHA_VANTAGE)
         self.session = None
-        self.requests_this_minute = 0
-        self.last_request_time = datetime.now()
+        self._api_key_query = urlencode({"apikey": self.api_key})
+        # Requests currently being made, keyed by their query params
+        self._inflight: Dict[frozenset, asyncio.Task] = {}
+        # Free tier allows a fixed number of requests in any rolling minute
+        self.rate_limiter = SlidingWindowRateLimiter(settings.ALPHA_VANTAGE_REQUESTS_PER_MINUTE, period=60)
+    
+    async def initialize(self):
+        """Create the shared HTTP session with a keep-alive connection pool."""
+        if self.session is not None:
+            return
+        
+        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5, keepalive_timeout=75, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+        # Callers that skipped initialize() still get the pooled session
+        if self.session is None:
+            await self.initialize()
         return self.session
         
-    async def _make_request(self, params: Dict[str, str]) -> Dict[str, Any]:
-        """Make a request to the Alpha Vantage API with rate limiting."""
-        # Add API key to params
-        params["apikey"] = self.api_key
+    async def _make_request(self, params: Dict[str, str]) -> Union[Dict[str, Any], str]:
+        """Make a request to the Alpha Vantage API, sharing it with identical in-flight requests."""
+        key = frozenset(params.items())
         
-        # Handle rate limiting (5 requests per minute for free tier)
-        now = datetime.now()
-        if (now - self.last_request_time).total_seconds() < 60 and self.requests_this_minute >= 5:
-            wait_time = 60 - (now - self.last_request_time).total_seconds()
-            logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds.")
-            await asyncio.sleep(wait_time)
-            self.requests_this_minute = 0
-            self.last_request_time = datetime.now()
-        
-        # Reset counter if more than a minute has passed
-        if (now - self.last_request_time).total_seconds() >= 60:
-            self.requests_this_minute = 0
-            self.last_request_time = now
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._send_request(params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one caller being cancelled does not cancel the others' request
+        return await asyncio.shield(task)
+    
+    async def _send_request(self, params: Dict[str, str]) -> Union[Dict[str, Any], str]:
+        """Send a request to the Alpha Vantage API with rate limiting; CSV requests return the raw text."""
+        # Append the pre-encoded API key and pass the URL as already encoded
+        url = URL(f"{self.BASE_URL}?{urlencode(params)}&{self._api_key_query}", encoded=True)
+        
+        # Wait for rate limit capacity
+        await self.rate_limiter.acquire()
         
         # Make the request
         session = await self._get_session()
-        async with session.get(self.BASE_URL, params=params) as response:
-            self.requests_this_minute += 1
-            
+        async with session.get(url) as response:
             if response.status != 200:
-                logger.error(f"Error from Alpha Vantage API: {response.status}")
+                logger.error("Error from Alpha Vantage API: %s", response.status)
                 return {}
             
+            if params.get("datatype") == "csv":
+                return await response.text()
+            
+            # Parse the body directly; Alpha Vantage does not always send a JSON content type
+            body = await response.read()
             try:
-                return await response.json()
-            except aiohttp.ContentTypeError:
-                logger.error("Invalid JSON response from Alpha Vantage API")
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                logger.error("Invalid JSON response from Alpha Vantage API (%d bytes)", len(body))
                 return {}
     
     async def get_stock_data(
@@ -64,43 +92,62 @@ class AlphaVantageProvider(BaseDataProvider):
         ticker: str, 
         start_date: datetime, 
         end_date: Optional[datetime] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[PriceRow]:
         """Retrieve daily stock price data."""
+        now = datetime.now()
         params = {
             "function": "TIME_SERIES_DAILY_ADJUSTED",
             "symbol": ticker,
-            "outputsize": "full" if (datetime.now() - start_date).days > 100 else "compact"
+            # Only request the full history when the compact window cannot cover the range
+            "outputsize": "full" if (now - start_date).days > self.COMPACT_OUTPUT_DAYS else "compact",
+            # CSV is far smaller than the labeled JSON and cheaper to parse
+            "datatype": "csv"
         }
         
         data = await self._make_request(params)
         
-        if not data or "Time Series (Daily)" not in data:
-            logger.warning(f"No data returned for {ticker}")
+        rows = csv.reader(io.StringIO(data)) if data else iter(())
+        header = next(rows, None)
+        
+        # Errors and rate-limit notices come back as JSON rather than CSV
+        if not header or header[0] != "timestamp":
+            logger.warning("No data returned for %s", ticker)
             return []
         
-        time_series = data["Time Series (Daily)"]
-        end_date = end_date or datetime.now()
+        end_date = end_date or now
         
-        # Format the response
+        # ISO dates sort lexicographically, so filter on the raw strings
+        start_str = start_date.strftime("%Y-%m-%d")
+        end_str = end_date.strftime("%Y-%m-%d")
+        
+        # Columns: timestamp, open, high, low, close, adjusted_close, volume, dividend_amount, split_coefficient
+        # The series arrives newest first, so stop once past the start
         result = []
-        for date_str, values in time_series.items():
-            date = datetime.strptime(date_str, "%Y-%m-%d")
+        for row in rows:
+            if not row:
+                continue
+            
+            date_str = row[0]
+            if date_str < start_str:
+                break
             
             # Filter by date range
-            if start_date <= date <= end_date:
-                result.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "open": float(values["1. open"]),
-                    "high": float(values["2. high"]),
-                    "low": float(values["3. low"]),
-                    "close": float(values["4. close"]),
-                    "adjusted_close": float(values["5. adjusted close"]),
-                    "volume": int(values["6. volume"]),
-                    "dividend_amount": float(values["7. dividend amount"]),
-                    "split_coefficient": float(values["8. split coefficient"])
-                })
-        
-        return sorted(result, key=lambda x: x["date"])
+            if date_str <= end_str:
+                result.append(PriceRow(
+                    date_str,
+                    float(row[1]),
+                    float(row[2]),
+                    float(row[3]),
+                    float(row[4]),
+                    float(row[5]),
+                    int(row[6]),
+                    float(row[7]),
+                    float(row[8])
+                ))
+        
+        # Return oldest first
+        result.reverse()
+        return result
     
     async def get_stock_info(self, ticker: str) -> Dict[str, Any]:
         """Retrieve overview information for a stock."""
@@ -112,7 +159,7 @@ class AlphaVantageProvider(BaseDataProvider):
         data = await self._make_request(params)
         
         if not data or "Symbol" not in data:
-            logger.warning(f"No overview data returned for {ticker}")
+            logger.warning("No overview data returned for %s", ticker)
             return {}
         
         return {
@@ -140,7 +187,7 @@ class AlphaVantageProvider(BaseDataProvider):
         data = await self._make_request(params)
         
         if not data or "bestMatches" not in data:
-            logger.warning(f"No search results for query: {query}")
+            logger.warning("No search results for query: %s", query)
             return []
         
         results = []
@@ -173,12 +220,8 @@ class AlphaVantageProvider(BaseDataProvider):
         
         return indices
     
-    @staticmethod
-    def handle_rate_limit() -> None:
-        """Handle rate limiting for the Alpha Vantage API."""
-        asyncio.sleep(12)  # Simple rate limiting (5 requests per minute = 12 seconds per request)
-    
     async def close(self):
         """Close the session."""
-        if self.session and not self.session.closed:
-            await self.session.close()
\ No newline at end of file
+        if self.session:
+            await self.session.close()
+            self.session = None
\ No newline at end of file
@@ -1,6 +1,18 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional
+
+class PriceRow(NamedTuple):
+    """One day of price data returned by a provider."""
+    date: str  # ISO date, YYYY-MM-DD
+    open: float
+    high: float
+    low: float
+    close: float
+    adjusted_close: float
+    volume: int
+    dividend_amount: float
+    split_coefficient: float
 
 class BaseDataProvider(ABC):
     """Abstract base class for all stock data providers."""
@@ -14,7 +26,7 @@ class BaseDataProvider(ABC):
         ticker: str, 
         start_date: datetime, 
         end_date: Optional[datetime] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[PriceRow]:
         """
         Retrieve stock price data for a given ticker and time range.
         
@@ -24,7 +36,7 @@ class BaseDataProvider(ABC):
             end_date: End date for data retrieval (defaults to today if None)
             
         Returns:
-            List of dictionaries containing price data
+            List of price rows, oldest first
         """
         pass
     
@@ -0,0 +1,26 @@
+import asyncio
+import time
+from collections import deque
+
+class SlidingWindowRateLimiter:
+    """Async limiter allowing at most max_requests in any rolling period."""
+    
+    def __init__(self, max_requests: int, period: float = 60.0):
+        self.max_requests = max_requests
+        self.period = period
+        self._window = deque(maxlen=max_requests)  # monotonic times of recent requests
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a request fits in the window, then record it."""
+        # Waiters queue on the lock so requests are admitted in arrival order
+        async with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= self.period:
+                self._window.popleft()
+            
+            if len(self._window) >= self.max_requests:
+                await asyncio.sleep(self._window[0] + self.period - now)
+                self._window.popleft()
+            
+            self._window.append(time.monotonic())
\ No newline at end of file
@@ -3,15 +3,16 @@ import asyncio
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, timedelta
 from aiokafka import AIOKafkaProducer
-import json
+import orjson
 
-from sqlalchemy import select, update, insert
+from sqlalchemy import select, insert, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from models.stock_data import Stock, StockPriceData
 from db import get_db_session, get_timescale_db_session
 from providers.alpha_vantage_provider import AlphaVantageProvider
+from providers.base_provider import PriceRow
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -24,10 +25,14 @@ class StockDataService:
         self.producer = None
     
     async def initialize(self):
-        """Initialize the Kafka producer."""
+        """Initialize the data provider session and the Kafka producer."""
+        await self.alpha_vantage.initialize()
+        
         self.producer = AIOKafkaProducer(
             bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8')
+            value_serializer=orjson.dumps,
+            linger_ms=50,
+            compression_type="lz4"
         )
         await self.producer.start()
     
@@ -73,54 +78,42 @@ class StockDataService:
         stock_info = await self.alpha_vantage.get_stock_info(ticker)
         
         if not stock_info:
-            logger.warning(f"Could not retrieve info for ticker {ticker}")
+            logger.warning("Could not retrieve info for ticker %s", ticker)
             return None
         
+        now = datetime.now()
+        
+        values = {
+            "name": stock_info.get("name", ""),
+            "sector": stock_info.get("sector", ""),
+            "industry": stock_info.get("industry", ""),
+            "market_cap": stock_info.get("market_cap", 0),
+            "exchange": stock_info.get("exchange", ""),
+            "is_active": True,
+            "updated_at": now
+        }
+        
         async with get_db_session() as session:
             try:
-                new_stock = Stock(
+                # Insert the stock, or refresh its details if the ticker already exists
+                query = pg_insert(Stock).values(
                     ticker=stock_info.get("ticker", "").upper(),
-                    name=stock_info.get("name", ""),
-                    sector=stock_info.get("sector", ""),
-                    industry=stock_info.get("industry", ""),
-                    market_cap=stock_info.get("market_cap", 0),
-                    exchange=stock_info.get("exchange", ""),
-                    is_active=True,
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
-                )
-                
-                session.add(new_stock)
-                await session.commit()
-                await session.refresh(new_stock)
-                
-                logger.info(f"Added new stock: {new_stock.ticker} ({new_stock.name})")
-                return new_stock
-            except IntegrityError:
-                await session.rollback()
-                # Stock might already exist, let's update it
-                query = update(Stock).where(Stock.ticker == ticker).values(
-                    name=stock_info.get("name", ""),
-                    sector=stock_info.get("sector", ""),
-                    industry=stock_info.get("industry", ""),
-                    market_cap=stock_info.get("market_cap", 0),
-                    exchange=stock_info.get("exchange", ""),
-                    is_active=True,
-                    updated_at=datetime.now()
-                )
-                await session.execute(query)
-                await session.commit()
+                    created_at=now,
+                    **values
+                ).on_conflict_do_update(
+                    index_elements=[Stock.ticker],
+                    set_=values
+                ).returning(Stock)
                 
-                # Get the updated stock
-                query = select(Stock).where(Stock.ticker == ticker)
                 result = await session.execute(query)
-                updated_stock = result.scalar_one_or_none()
+                stock = result.scalar_one()
+                await session.commit()
                 
-                logger.info(f"Updated existing stock: {ticker}")
-                return updated_stock
+                logger.info("Saved stock: %s (%s)", stock.ticker, stock.name)
+                return stock
             except Exception as e:
                 await session.rollback()
-                logger.error(f"Error adding stock {ticker}: {str(e)}")
+                logger.error("Error adding stock %s: %s", ticker, e)
                 return None
     
     async def import_market_index(self, index_symbol: str) -> List[Stock]:
@@ -146,21 +139,22 @@ class StockDataService:
         
         # Get tickers for the requested index
         if index_symbol.lower() not in index_components:
-            logger.warning(f"Unknown index: {index_symbol}")
+            logger.warning("Unknown index: %s", index_symbol)
             return []
         
         tickers = index_components[index_symbol.lower()]
         added_stocks = []
         
-        for ticker in tickers:
-            try:
-                stock = await self.add_stock(ticker)
-                if stock:
-                    added_stocks.append(stock)
-            except Exception as e:
-                logger.error(f"Error adding stock {ticker} from index {index_symbol}: {str(e)}")
+        # Add the stocks concurrently; the provider's rate limiter paces the API calls
+        results = await asyncio.gather(*(self.add_stock(ticker) for ticker in tickers), return_exceptions=True)
+        
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, Exception):
+                logger.error("Error adding stock %s from index %s: %s", ticker, index_symbol, result)
+            elif result:
+                added_stocks.append(result)
         
-        logger.info(f"Imported {len(added_stocks)} stocks from index {index_symbol}")
+        logger.info("Imported %d stocks from index %s", len(added_stocks), index_symbol)
         return added_stocks
     
     async def import_historical_data(
@@ -172,7 +166,7 @@ class StockDataService:
         # Get the stock
         stock = await self.get_stock_by_id(stock_id)
         if not stock:
-            logger.warning(f"Stock with ID {stock_id} not found")
+            logger.warning("Stock with ID %s not found", stock_id)
             return {"success": False, "message": f"Stock with ID {stock_id} not found"}
         
         # Calculate date range
@@ -183,32 +177,17 @@ class StockDataService:
         price_data = await self.alpha_vantage.get_stock_data(stock.ticker, start_date, end_date)
         
         if not price_data:
-            logger.warning(f"No historical data found for {stock.ticker}")
+            logger.warning("No historical data found for %s", stock.ticker)
             return {"success": False, "message": f"No historical data found for {stock.ticker}"}
         
         # Store data in TimescaleDB
         async with get_timescale_db_session() as session:
             try:
-                for data_point in price_data:
-                    price_record = StockPriceData(
-                        stock_id=stock_id,
-                        timestamp=datetime.strptime(data_point["date"], "%Y-%m-%d"),
-                        open=data_point["open"],
-                        high=data_point["high"],
-                        low=data_point["low"],
-                        close=data_point["close"],
-                        volume=data_point["volume"],
-                        adjusted_close=data_point["adjusted_close"],
-                        data_source="alpha_vantage",
-                        created_at=datetime.now()
-                    )
-                    session.add(price_record)
-                
-                await session.commit()
+                await self._store_price_rows(session, stock_id, price_data)
                 
-                # Send data to Kafka for further processing
+                # Queue data for Kafka; the producer batches sends and flushes on close
                 if self.producer:
-                    await self.producer.send_and_wait(
+                    await self.producer.send(
                         settings.KAFKA_PRICE_DATA_TOPIC,
                         {
                             "stock_id": stock_id,
@@ -220,7 +199,7 @@ class StockDataService:
                         }
                     )
                 
-                logger.info(f"Imported {len(price_data)} historical data points for {stock.ticker}")
+                logger.info("Imported %d historical data points for %s", len(price_data), stock.ticker)
                 return {
                     "success": True, 
                     "message": f"Imported {len(price_data)} historical data points",
@@ -230,9 +209,35 @@ class StockDataService:
                 }
             except Exception as e:
                 await session.rollback()
-                logger.error(f"Error importing historical data for {stock.ticker}: {str(e)}")
+                logger.error("Error importing historical data for %s: %s", stock.ticker, e)
                 return {"success": False, "message": f"Error: {str(e)}"}
     
+    async def _store_price_rows(self, session: AsyncSession, stock_id: int, price_data: List[PriceRow]) -> None:
+        """Insert price rows in DATA_BATCH_SIZE chunks, committing after each one."""
+        batch_size = settings.DATA_BATCH_SIZE
+        
+        for i in range(0, len(price_data), batch_size):
+            await session.execute(insert(StockPriceData), self._price_rows(stock_id, price_data[i:i + batch_size]))
+            await session.commit()
+    
+    def _price_rows(self, stock_id: int, price_data: List[PriceRow]) -> List[Dict[str, Any]]:
+        """Build StockPriceData insert parameters from provider price rows."""
+        created_at = datetime.now()
+        return [
+            {
+                "stock_id": stock_id,
+                "timestamp": datetime.fromisoformat(row.date),
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "volume": row.volume,
+                "adjusted_close": row.adjusted_close,
+                "data_source": "alpha_vantage",
+                "created_at": created_at
+            } for row in price_data
+        ]
+    
     async def get_latest_price_data(self, stock_id: int) -> Dict[str, Any]:
         """Get the latest price data for a stock."""
         async with get_timescale_db_session() as session:
@@ -257,97 +262,110 @@ class StockDataService:
                 "adjusted_close": latest_data.adjusted_close
             }
     
+    async def get_latest_timestamps(self, stock_ids: List[int]) -> Dict[int, datetime]:
+        """Get the timestamp of the latest price data for each stock in one query."""
+        if not stock_ids:
+            return {}
+        
+        async with get_timescale_db_session() as session:
+            query = select(
+                StockPriceData.stock_id,
+                func.max(StockPriceData.timestamp)
+            ).where(
+                StockPriceData.stock_id.in_(stock_ids)
+            ).group_by(StockPriceData.stock_id)
+            
+            result = await session.execute(query)
+            return dict(result.all())
+    
     async def import_latest_data_for_all_stocks(self) -> Dict[str, Any]:
         """Import the latest data for all active stocks."""
         stocks = await self.get_all_stocks(active_only=True)
         
-        results = {
+        # Look up where each stock's stored data ends in a single round-trip
+        latest_timestamps = await self.get_latest_timestamps([stock.id for stock in stocks])
+        
+        # Import stocks concurrently; the provider's rate limiter paces the API calls
+        semaphore = asyncio.Semaphore(settings.DATA_IMPORT_CONCURRENCY)
+        
+        async def import_stock(stock: Stock) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._import_latest_data_for_stock(stock, latest_timestamps.get(stock.id))
+        
+        details = await asyncio.gather(*(import_stock(stock) for stock in stocks))
+        
+        # Deliver the queued Kafka messages in as few batches as possible
+        if self.producer:
+            await self.producer.flush()
+        
+        succeeded = sum(1 for detail in details if detail["success"])
+        return {
             "total": len(stocks),
-            "success": 0,
-            "failed": 0,
-            "details": []
+            "success": succeeded,
+            "failed": len(details) - succeeded,
+            "details": list(details)
         }
-        
-        for stock in stocks:
-            try:
-                # Get the latest data point in the database
-                latest_data = await self.get_latest_price_data(stock.id)
-                
-                # Set the start date to the day after the latest data point
-                # or to yesterday if no data is available
-                if latest_data:
-                    start_date = datetime.fromisoformat(latest_data["timestamp"]) + timedelta(days=1)
-                else:
-                    start_date = datetime.now() - timedelta(days=1)
-                
-                # Get data from Alpha Vantage
-                end_date = datetime.now()
-                price_data = await self.alpha_vantage.get_stock_data(stock.ticker, start_date, end_date)
-                
-                if not price_data:
-                    results["failed"] += 1
-                    results["details"].append({
-                        "stock_id": stock.id,
-                        "ticker": stock.ticker,
-                        "success": False,
-                        "message": "No new data available"
-                    })
-                    continue
-                
-                # Store data in TimescaleDB
-                async with get_timescale_db_session() as session:
-                    for data_point in price_data:
-                        price_record = StockPriceData(
-                            stock_id=stock.id,
-                            timestamp=datetime.strptime(data_point["date"], "%Y-%m-%d"),
-                            open=data_point["open"],
-                            high=data_point["high"],
-                            low=data_point["low"],
-                            close=data_point["close"],
-                            volume=data_point["volume"],
-                            adjusted_close=data_point["adjusted_close"],
-                            data_source="alpha_vantage",
-                            created_at=datetime.now()
-                        )
-                        session.add(price_record)
-                    
-                    await session.commit()
-                
-                # Send data to Kafka for further processing
-                if self.producer:
-                    await self.producer.send_and_wait(
-                        settings.KAFKA_PRICE_DATA_TOPIC,
-                        {
-                            "stock_id": stock.id,
-                            "ticker": stock.ticker,
-                            "data_source": "alpha_vantage",
-                            "data_points": len(price_data),
-                            "start_date": start_date.isoformat(),
-                            "end_date": end_date.isoformat()
-                        }
-                    )
-                
-                results["success"] += 1
-                results["details"].append({
-                    "stock_id": stock.id,
-                    "ticker": stock.ticker,
-                    "success": True,
-                    "data_points": len(price_data)
-                })
-                
-                logger.info(f"Imported {len(price_data)} new data points for {stock.ticker}")
-                
-                # Rate limiting
-                await asyncio.sleep(12)  # Sleep to respect API rate limits
-                
-            except Exception as e:
-                results["failed"] += 1
-                results["details"].append({
+    
+    async def _import_latest_data_for_stock(
+        self, 
+        stock: Stock, 
+        latest_timestamp: Optional[datetime]
+    ) -> Dict[str, Any]:
+        """Import data newer than latest_timestamp for a single stock and describe the outcome."""
+        try:
+            end_date = datetime.now()
+            
+            # Set the start date to the day after the latest data point
+            # or to yesterday if no data is available. Stored dates were written
+            # as naive values, so drop the tzinfo timestamptz reads come back with
+            if latest_timestamp:
+                start_date = latest_timestamp.replace(tzinfo=None) + timedelta(days=1)
+            else:
+                start_date = end_date - timedelta(days=1)
+            
+            # Get data from Alpha Vantage
+            price_data = await self.alpha_vantage.get_stock_data(stock.ticker, start_date, end_date)
+            
+            if not price_data:
+                return {
                     "stock_id": stock.id,
                     "ticker": stock.ticker,
                     "success": False,
-                    "message": str(e)
-                })
-                logger.error(f"Error importing latest data for {stock.ticker}: {str(e)}")
+                    "message": "No new data available"
+                }
+            
+            # Store data in TimescaleDB
+            async with get_timescale_db_session() as session:
+                await self._store_price_rows(session, stock.id, price_data)
+            
+            # Queue data for Kafka; flushed once all stocks are imported
+            if self.producer:
+                await self.producer.send(
+                    settings.KAFKA_PRICE_DATA_TOPIC,
+                    {
+                        "stock_id": stock.id,
+                        "ticker": stock.ticker,
+                        "data_source": "alpha_vantage",
+                        "data_points": len(price_data),
+                        "start_date": start_date.isoformat(),
+                        "end_date": end_date.isoformat()
+                    }
+                )
+            
+            logger.info("Imported %d new data points for %s", len(price_data), stock.ticker)
+            
+            return {
+                "stock_id": stock.id,
+                "ticker": stock.ticker,
+                "success": True,
+                "data_points": len(price_data)
+            }
         
-        return results
\ No newline at end of file
+        except Exception as e:
+            logger.error("Error importing latest data for %s: %s", stock.ticker, e)
+            return {
+                "stock_id": stock.id,
+                "ticker": stock.ticker,
+                "success": False,
+                "message": str(e)
+            }
\ No newline at end of file
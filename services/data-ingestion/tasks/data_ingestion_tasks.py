@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import uuid
 from datetime import datetime, timedelta
 
 from config import settings
@@ -8,6 +9,9 @@ from services.feature_engineering_service import FeatureEngineeringService
 
 logger = logging.getLogger(__name__)
 
+# Queued historical import job IDs, consumed by run_historical_import_worker
+_historical_import_queue: asyncio.Queue = asyncio.Queue()
+
 async def start_scheduled_data_ingestion():
     """Start scheduled data ingestion tasks."""
     stock_service = StockDataService()
@@ -21,35 +25,41 @@ async def start_scheduled_data_ingestion():
                 # Import latest data for all stocks
                 logger.info("Starting scheduled data import")
                 results = await stock_service.import_latest_data_for_all_stocks()
-                logger.info(f"Completed data import: {results['success']} succeeded, {results['failed']} failed")
+                logger.info("Completed data import: %s succeeded, %s failed", results['success'], results['failed'])
+                
+                # Generate features for every stock with new data in one batch: a single price
+                # query, per-stock computation in the worker pool and a single COPY
+                stock_ids = [
+                    detail["stock_id"] for detail in results["details"]
+                    if detail["success"] and detail.get("data_points", 0) > 0
+                ]
                 
-                # Generate features for stocks with new data
-                for detail in results["details"]:
-                    if detail["success"] and detail.get("data_points", 0) > 0:
+                if stock_ids:
+                    try:
                         # Get 60 days of data for feature calculation
                         end_date = datetime.now()
                         start_date = end_date - timedelta(days=60)
                         
-                        logger.info(f"Generating features for {detail['ticker']} (ID: {detail['stock_id']})")
-                        features = await feature_service.generate_features_for_stock(
-                            detail["stock_id"], start_date, end_date
+                        logger.info("Generating features for %d stocks", len(stock_ids))
+                        features_by_stock = await feature_service.generate_features_for_stocks(
+                            stock_ids, start_date, end_date
                         )
-                        
-                        if features:
-                            await feature_service.store_features(detail["stock_id"], features)
-                            logger.info(f"Stored features for {detail['ticker']}")
+                        await feature_service.store_features_for_stocks(features_by_stock)
+                    
+                    except Exception as e:
+                        logger.error("Error generating features for stock_ids %s: %s", stock_ids, e)
                 
                 # Wait for the next scheduled run
-                logger.info(f"Waiting {settings.DATA_FETCH_INTERVAL_MINUTES} minutes for next data import")
+                logger.info("Waiting %s minutes for next data import", settings.DATA_FETCH_INTERVAL_MINUTES)
                 await asyncio.sleep(settings.DATA_FETCH_INTERVAL_MINUTES * 60)
                 
             except Exception as e:
-                logger.error(f"Error in scheduled data ingestion: {str(e)}")
+                logger.error("Error in scheduled data ingestion: %s", e)
                 # Wait before retrying
                 await asyncio.sleep(300)  # 5 minutes
     
     except Exception as e:
-        logger.error(f"Failed to start scheduled data ingestion: {str(e)}")
+        logger.error("Failed to start scheduled data ingestion: %s", e)
     finally:
         await stock_service.close()
 
@@ -63,39 +73,62 @@ async def import_historical_data_for_all_stocks():
         
         # Get all active stocks
         stocks = await stock_service.get_all_stocks(active_only=True)
-        logger.info(f"Importing historical data for {len(stocks)} stocks")
+        logger.info("Importing historical data for %d stocks", len(stocks))
         
-        for stock in stocks:
-            try:
-                # Import historical data
-                logger.info(f"Importing historical data for {stock.ticker} (ID: {stock.id})")
-                result = await stock_service.import_historical_data(
-                    stock.id, days=settings.HISTORICAL_DATA_DAYS
-                )
-                
-                if result["success"]:
-                    # Generate features
-                    end_date = datetime.now()
-                    start_date = end_date - timedelta(days=settings.HISTORICAL_DATA_DAYS)
-                    
-                    logger.info(f"Generating features for {stock.ticker}")
-                    features = await feature_service.generate_features_for_stock(
-                        stock.id, start_date, end_date
+        # Import stocks concurrently; the provider's rate limiter paces the API calls
+        semaphore = asyncio.Semaphore(settings.DATA_IMPORT_CONCURRENCY)
+        
+        async def import_stock(stock):
+            async with semaphore:
+                try:
+                    # Import historical data
+                    logger.info("Importing historical data for %s (ID: %s)", stock.ticker, stock.id)
+                    result = await stock_service.import_historical_data(
+                        stock.id, days=settings.HISTORICAL_DATA_DAYS
                     )
                     
-                    if features:
-                        await feature_service.store_features(stock.id, features)
-                        logger.info(f"Stored features for {stock.ticker}")
-                
-                # Rate limiting
-                await asyncio.sleep(12)  # Sleep to respect API rate limits
+                    if result["success"]:
+                        # Generate features
+                        end_date = datetime.now()
+                        start_date = end_date - timedelta(days=settings.HISTORICAL_DATA_DAYS)
+                        
+                        logger.info("Generating features for %s", stock.ticker)
+                        features = await feature_service.generate_features_for_stock(
+                            stock.id, start_date, end_date
+                        )
+                        
+                        if features:
+                            await feature_service.store_features(stock.id, features)
+                            logger.info("Stored features for %s", stock.ticker)
                 
-            except Exception as e:
-                logger.error(f"Error processing {stock.ticker}: {str(e)}")
+                except Exception as e:
+                    logger.error("Error processing %s: %s", stock.ticker, e)
+        
+        await asyncio.gather(*(import_stock(stock) for stock in stocks))
         
         logger.info("Completed historical data import for all stocks")
     
     except Exception as e:
-        logger.error(f"Failed to import historical data: {str(e)}")
+        logger.error("Failed to import historical data: %s", e)
     finally:
-        await stock_service.close()
\ No newline at end of file
+        await stock_service.close()
+
+def enqueue_historical_import() -> str:
+    """Queue a historical data import for all stocks and return its job ID."""
+    job_id = uuid.uuid4().hex
+    _historical_import_queue.put_nowait(job_id)
+    logger.info("Queued historical data import job %s", job_id)
+    return job_id
+
+async def run_historical_import_worker():
+    """Run queued historical data imports one at a time."""
+    while True:
+        job_id = await _historical_import_queue.get()
+        try:
+            logger.info("Starting historical data import job %s", job_id)
+            await import_historical_data_for_all_stocks()
+            logger.info("Finished historical data import job %s", job_id)
+        except Exception as e:
+            logger.error("Historical data import job %s failed: %s", job_id, e)
+        finally:
+            _historical_import_queue.task_done()
\ No newline at end of file
@@ -1,16 +1,101 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-import logging
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import select
+from itertools import groupby, repeat
+from operator import itemgetter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.stock_data import StockFeatureData, StockPriceData
-from db import get_timescale_db_session
+from config import settings
+from db import get_timescale_db_session, TimeScaleAsyncSessionLocal
+from services.indicator_kernels import multi_ema, multi_sma, rolling_max, rolling_min, rolling_window_stats
 
 logger = logging.getLogger(__name__)
 
+# Prices are computed in float32, which keeps OHLC precision and halves memory traffic
+# in the rolling kernels; volume stays float64 and sums accumulate in float64
+PRICE_DTYPE = np.float32
+
+# Feature computation runs in one worker process per core
+_FEATURE_WORKERS = os.cpu_count() or 1
+_feature_executor: Optional[ProcessPoolExecutor] = None
+
+def get_feature_executor() -> ProcessPoolExecutor:
+    """Get the process pool that feature computation runs in."""
+    global _feature_executor
+    
+    if _feature_executor is None:
+        _feature_executor = ProcessPoolExecutor(max_workers=_FEATURE_WORKERS, initializer=_warm_up_worker)
+    
+    return _feature_executor
+
+async def warm_up_feature_executor() -> None:
+    """Start every feature worker up front so JIT compilation is paid at startup, not on first use."""
+    loop = asyncio.get_running_loop()
+    executor = get_feature_executor()
+    
+    # Concurrent submissions make the pool spawn all of its workers
+    await asyncio.gather(*(
+        loop.run_in_executor(executor, os.getpid) for _ in range(_FEATURE_WORKERS)
+    ))
+    logger.info("Warmed up %d feature workers", _FEATURE_WORKERS)
+
+def shutdown_feature_executor() -> None:
+    """Shut down the feature computation process pool."""
+    global _feature_executor
+    
+    if _feature_executor is not None:
+        _feature_executor.shutdown(cancel_futures=True)
+        _feature_executor = None
+
+def _warm_up_worker() -> None:
+    """Compile the Numba kernels in a new worker by computing features for a small synthetic series."""
+    close = np.linspace(100.0, 110.0, 64)
+    FeatureEngineeringService().compute_features(pd.DataFrame({
+        "date": pd.date_range("2000-01-01", periods=len(close), tz="UTC"),
+        "open": close,
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": np.full(len(close), 1000.0),
+        "adjusted_close": close
+    }))
+
+def _compute_features(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Compute all features for a price DataFrame inside a worker process."""
+    return FeatureEngineeringService().compute_features(df)
+
+# Columns feature generation reads, in the order _price_frame unpacks them
+PRICE_DATA_QUERY = """
+    SELECT timestamp, open::float8, high::float8, low::float8, close::float8,
+           volume::float8, adjusted_close::float8
+    FROM stock_data.price_data
+    WHERE stock_id = $1 AND timestamp >= $2 AND timestamp <= $3
+    ORDER BY timestamp
+"""
+
+# Same columns for several stocks at once, grouped by stock for generate_features_for_stocks
+PRICE_DATA_BATCH_QUERY = """
+    SELECT stock_id, timestamp, open::float8, high::float8, low::float8, close::float8,
+           volume::float8, adjusted_close::float8
+    FROM stock_data.price_data
+    WHERE stock_id = ANY($1::int[]) AND timestamp >= $2 AND timestamp <= $3
+    ORDER BY stock_id, timestamp
+"""
+
+# Target of the COPY in store_features, see database/init/02_stock_data_tables.sql
+FEATURE_DATA_SCHEMA = "stock_data"
+FEATURE_DATA_TABLE = "feature_data"
+FEATURE_DATA_COLUMNS = ["stock_id", "timestamp", "feature_name", "feature_value", "created_at"]
+
+# Run any remaining pandas rolling aggregations through the compiled Numba engine; they run
+# single-threaded since each feature worker process already has a core to itself
+ROLLING_NUMBA_KW = {"engine": "numba", "engine_kwargs": {"nopython": True, "nogil": True}}
+
 class FeatureEngineeringService:
     """Service for generating engineered features from stock price data."""
     
@@ -34,8 +119,8 @@ class FeatureEngineeringService:
         start_date: datetime, 
         end_date: Optional[datetime] = None,
         session: Optional[AsyncSession] = None
-    ) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate all features for a given stock and time range."""
+    ) -> Dict[str, pd.DataFrame]:
+        """Generate all features for a given stock and time range, one frame with a date column per feature type."""
         end_date = end_date or datetime.now()
         
         # Get price data for the stock
@@ -46,34 +131,99 @@ class FeatureEngineeringService:
             price_data = await self._get_price_data(stock_id, start_date, end_date, session)
         
         if not price_data:
-            logger.warning(f"No price data found for stock_id {stock_id} in the given time range")
+            logger.warning("No price data found for stock_id %s in the given time range", stock_id)
+            return {}
+        
+        # Transpose the row tuples once; rows already arrive ordered by timestamp
+        df = self._price_frame(zip(*price_data))
+        
+        # Indicator math is CPU-bound, so run it in a worker process to use every core
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_feature_executor(), _compute_features, df)
+    
+    async def generate_features_for_stocks(
+        self, 
+        stock_ids: List[int], 
+        start_date: datetime, 
+        end_date: Optional[datetime] = None,
+        session: Optional[AsyncSession] = None
+    ) -> Dict[int, Dict[str, pd.DataFrame]]:
+        """Generate all features for several stocks, fetching their price data in one query."""
+        if not stock_ids:
             return {}
         
-        # Convert to DataFrame for easier processing
-        df = pd.DataFrame([
-            {
-                "date": pd.Timestamp(row.timestamp),
-                "open": row.open,
-                "high": row.high,
-                "low": row.low,
-                "close": row.close,
-                "volume": row.volume,
-                "adjusted_close": row.adjusted_close
-            } for row in price_data
-        ])
-        
-        # Sort by date
-        df = df.sort_values("date")
+        end_date = end_date or datetime.now()
+        extended_start_date = start_date - timedelta(days=200)  # 200 days for longest lookback
+        
+        # One round trip for every stock's price data
+        if session is None:
+            async with get_timescale_db_session() as session:
+                price_data = await self._fetch(
+                    session, PRICE_DATA_BATCH_QUERY, stock_ids, extended_start_date, end_date
+                )
+        else:
+            price_data = await self._fetch(
+                session, PRICE_DATA_BATCH_QUERY, stock_ids, extended_start_date, end_date
+            )
+        
+        # Hand each stock to the worker pool as soon as its frame is built, so computing
+        # earlier stocks overlaps with building the frames of later ones
+        loop = asyncio.get_running_loop()
+        executor = get_feature_executor()
+        pending = {}
+        for stock_id, stock_rows in groupby(price_data, key=itemgetter(0)):
+            _, *columns = zip(*stock_rows)
+            pending[stock_id] = loop.run_in_executor(executor, _compute_features, self._price_frame(columns))
+        
+        for stock_id in set(stock_ids) - pending.keys():
+            logger.warning("No price data found for stock_id %s in the given time range", stock_id)
+        
+        results = await asyncio.gather(*pending.values(), return_exceptions=True)
+        
+        features_by_stock = {}
+        for stock_id, features in zip(pending, results):
+            if isinstance(features, Exception):
+                logger.error("Error generating features for stock_id %s: %s", stock_id, features)
+            elif features:
+                features_by_stock[stock_id] = features
+        
+        return features_by_stock
+    
+    def _price_frame(self, columns) -> pd.DataFrame:
+        """Build the price DataFrame from (timestamp, open, high, low, close, volume, adjusted_close) columns."""
+        timestamps, opens, highs, lows, closes, volumes, adjusted_closes = columns
+        return pd.DataFrame({
+            # TIMESTAMPTZ values are converted straight to UTC datetime64 in one vectorised
+            # call, skipping pandas' per-element offset reconciliation
+            "date": pd.to_datetime(timestamps, utc=True),
+            "open": np.array(opens, dtype=PRICE_DTYPE),
+            "high": np.array(highs, dtype=PRICE_DTYPE),
+            "low": np.array(lows, dtype=PRICE_DTYPE),
+            "close": np.array(closes, dtype=PRICE_DTYPE),
+            "volume": np.array(volumes, dtype=np.float64),
+            "adjusted_close": np.array(adjusted_closes, dtype=PRICE_DTYPE)
+        })
+    
+    def compute_features(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Run every feature generator over a price DataFrame."""
+        # The 20-day Bollinger Bands and price channel share one fused rolling pass
+        window_stats = self._rolling_window_stats(df, 20)
+        # Close-to-close changes are shared by RSI and On-Balance Volume
+        price_changes = np.diff(df["close"].to_numpy(dtype=PRICE_DTYPE))
+        generator_kwargs = {
+            "bollinger_bands": {"window_stats": window_stats},
+            "price_channel": {"window_stats": window_stats},
+            "relative_strength_index": {"price_changes": price_changes},
+            "on_balance_volume": {"price_changes": price_changes}
+        }
         
         # Generate all features
         features = {}
         for feature_name, generator_func in self.feature_generators.items():
             try:
-                feature_df = generator_func(df)
-                # Convert back to list of dictionaries
-                features[feature_name] = feature_df.to_dict("records")
+                features[feature_name] = generator_func(df, **generator_kwargs.get(feature_name, {}))
             except Exception as e:
-                logger.error(f"Error generating feature {feature_name}: {str(e)}")
+                logger.error("Error generating feature %s: %s", feature_name, e)
         
         return features
     
@@ -83,89 +233,108 @@ class FeatureEngineeringService:
         start_date: datetime, 
         end_date: datetime,
         session: AsyncSession
-    ) -> List[StockPriceData]:
-        """Retrieve price data for a stock from the database."""
+    ) -> List[Tuple]:
+        """Retrieve (timestamp, open, high, low, close, volume, adjusted_close) rows for a stock."""
         # We need more data for lookback periods, so extend start date
         extended_start_date = start_date - timedelta(days=200)  # 200 days for longest lookback
         
-        query = select(StockPriceData).where(
-            StockPriceData.stock_id == stock_id,
-            StockPriceData.timestamp >= extended_start_date,
-            StockPriceData.timestamp <= end_date
-        ).order_by(StockPriceData.timestamp)
-        
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await self._fetch(session, PRICE_DATA_QUERY, stock_id, extended_start_date, end_date)
     
-    def _generate_moving_average(self, df: pd.DataFrame, windows: List[int] = [5, 10, 20, 50, 100, 200]) -> pd.DataFrame:
+    async def _fetch(self, session: AsyncSession, query: str, *args) -> List[Tuple]:
+        """Run a price query straight on the session's asyncpg connection."""
+        # Skipping SQLAlchemy row processing; the NUMERIC prices are cast to float8
+        # server-side so no Decimal objects are built
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        return await raw_connection.driver_connection.fetch(query, *args)
+    
+    def _generate_moving_average(self, df: pd.DataFrame, windows: Optional[List[int]] = None) -> pd.DataFrame:
         """Generate simple moving averages for different window sizes."""
-        result_df = pd.DataFrame({"date": df["date"]})
+        windows = windows or settings.FEATURE_CALCULATION_INTERVALS
         
-        for window in windows:
-            col_name = f"ma_{window}"
-            result_df[col_name] = df["close"].rolling(window=window).mean()
+        # Every window is computed from one cumulative sum of the closes
+        moving_averages = multi_sma(df["close"].to_numpy(dtype=PRICE_DTYPE), np.asarray(windows, dtype=np.int64))
         
-        return result_df
+        columns = {"date": df["date"]}
+        for window, moving_average in zip(windows, moving_averages):
+            columns[f"ma_{window}"] = moving_average
+        
+        # Build the frame once rather than inserting a column per window
+        return pd.DataFrame(columns, index=df.index)
     
-    def _generate_exponential_moving_average(self, df: pd.DataFrame, windows: List[int] = [5, 10, 20, 50, 100, 200]) -> pd.DataFrame:
+    def _generate_exponential_moving_average(self, df: pd.DataFrame, windows: Optional[List[int]] = None) -> pd.DataFrame:
         """Generate exponential moving averages for different window sizes."""
-        result_df = pd.DataFrame({"date": df["date"]})
+        windows = windows or settings.FEATURE_CALCULATION_INTERVALS
         
-        for window in windows:
-            col_name = f"ema_{window}"
-            result_df[col_name] = df["close"].ewm(span=window, adjust=False).mean()
+        # All spans are computed in one compiled kernel call
+        emas = multi_ema(df["close"].to_numpy(dtype=PRICE_DTYPE), np.asarray(windows, dtype=np.int64))
         
-        return result_df
+        columns = {"date": df["date"]}
+        for window, ema in zip(windows, emas):
+            columns[f"ema_{window}"] = ema
+        
+        return pd.DataFrame(columns, index=df.index)
     
-    def _generate_rsi(self, df: pd.DataFrame, windows: List[int] = [9, 14, 25]) -> pd.DataFrame:
+    def _generate_rsi(
+        self, 
+        df: pd.DataFrame, 
+        windows: List[int] = [9, 14, 25],
+        price_changes: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
         """Generate Relative Strength Index for different window sizes."""
-        result_df = pd.DataFrame({"date": df["date"]})
+        columns = {"date": df["date"]}
+        
+        # Split the price changes into gains and losses once
+        close = df["close"].to_numpy(dtype=PRICE_DTYPE)
+        delta = price_changes if price_changes is not None else np.diff(close)
+        gain = np.maximum(delta, 0.0)
+        loss = np.maximum(-delta, 0.0)
         
-        # Calculate price changes
-        delta = df["close"].diff()
+        # Prefix sums give every window's rolling average gain and loss
+        cs_gain = np.concatenate(([0.0], np.cumsum(gain, dtype=np.float64)))
+        cs_loss = np.concatenate(([0.0], np.cumsum(loss, dtype=np.float64)))
         
         for window in windows:
-            # Get gains and losses
-            gain = delta.copy()
-            loss = delta.copy()
-            gain[gain < 0] = 0
-            loss[loss > 0] = 0
-            loss = -loss
-            
-            # Calculate average gain and loss
-            avg_gain = gain.rolling(window=window).mean()
-            avg_loss = loss.rolling(window=window).mean()
-            
-            # Calculate RS and RSI
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
+            rsi = np.full(len(close), np.nan)
+            if window < len(close):
+                avg_gain = (cs_gain[window:] - cs_gain[:-window]) / window
+                avg_loss = (cs_loss[window:] - cs_loss[:-window]) / window
+                
+                # Calculate RS and RSI; no losses gives an RSI of 100
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    rs = avg_gain / avg_loss
+                    rsi[window:] = 100 - (100 / (1 + rs))
             
-            col_name = f"rsi_{window}"
-            result_df[col_name] = rsi
+            columns[f"rsi_{window}"] = rsi
         
-        return result_df
+        return pd.DataFrame(columns, index=df.index)
     
-    def _generate_bollinger_bands(self, df: pd.DataFrame, window: int = 20, num_std: float = 2.0) -> pd.DataFrame:
-        """Generate Bollinger Bands."""
-        result_df = pd.DataFrame({"date": df["date"]})
-        
-        # Calculate middle band (simple moving average)
-        middle_band = df["close"].rolling(window=window).mean()
+    def _generate_bollinger_bands(
+        self, 
+        df: pd.DataFrame, 
+        window: int = 20, 
+        num_std: float = 2.0,
+        window_stats: Optional[Tuple[np.ndarray, ...]] = None
+    ) -> pd.DataFrame:
+        """Generate Bollinger Bands, reusing precomputed rolling_window_stats for the same window if given."""
+        if window_stats is None:
+            window_stats = self._rolling_window_stats(df, window)
         
-        # Calculate standard deviation
-        std = df["close"].rolling(window=window).std()
+        # Middle band is the simple moving average
+        middle_band, std, _, _ = window_stats
         
         # Calculate upper and lower bands
         upper_band = middle_band + (std * num_std)
         lower_band = middle_band - (std * num_std)
         
         # Store results
-        result_df["bb_middle"] = middle_band
-        result_df["bb_upper"] = upper_band
-        result_df["bb_lower"] = lower_band
-        result_df["bb_width"] = (upper_band - lower_band) / middle_band
-        
-        return result_df
+        return pd.DataFrame({
+            "date": df["date"],
+            "bb_middle": middle_band,
+            "bb_upper": upper_band,
+            "bb_lower": lower_band,
+            "bb_width": (upper_band - lower_band) / middle_band
+        }, index=df.index)
     
     def _generate_macd(
         self, 
@@ -177,15 +346,17 @@ class FeatureEngineeringService:
         """Generate MACD (Moving Average Convergence Divergence)."""
         result_df = pd.DataFrame({"date": df["date"]})
         
-        # Calculate fast and slow EMAs
-        ema_fast = df["close"].ewm(span=fast_period, adjust=False).mean()
-        ema_slow = df["close"].ewm(span=slow_period, adjust=False).mean()
+        # Calculate fast and slow EMAs in one pass
+        ema_fast, ema_slow = multi_ema(
+            df["close"].to_numpy(dtype=PRICE_DTYPE),
+            np.array([fast_period, slow_period], dtype=np.int64)
+        )
         
         # Calculate MACD line
         macd_line = ema_fast - ema_slow
         
         # Calculate signal line
-        signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
+        signal_line = multi_ema(macd_line, np.array([signal_period], dtype=np.int64))[0]
         
         # Calculate histogram
         histogram = macd_line - signal_line
@@ -199,34 +370,39 @@ class FeatureEngineeringService:
     
     def _generate_rate_of_change(self, df: pd.DataFrame, windows: List[int] = [5, 10, 20]) -> pd.DataFrame:
         """Generate Rate of Change for different window sizes."""
-        result_df = pd.DataFrame({"date": df["date"]})
+        columns = {"date": df["date"]}
+        close = df["close"].to_numpy(dtype=PRICE_DTYPE)
         
         for window in windows:
-            # Calculate rate of change as percentage
-            roc = ((df["close"] / df["close"].shift(window)) - 1) * 100
+            # Calculate rate of change as percentage against the close window bars earlier
+            roc = np.full(len(close), np.nan)
+            if window < len(close):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    roc[window:] = ((close[window:] / close[:-window]) - 1) * 100
             
-            col_name = f"roc_{window}"
-            result_df[col_name] = roc
+            columns[f"roc_{window}"] = roc
         
-        return result_df
+        return pd.DataFrame(columns, index=df.index)
     
     def _generate_atr(self, df: pd.DataFrame, window: int = 14) -> pd.DataFrame:
         """Generate Average True Range."""
-        result_df = pd.DataFrame({"date": df["date"]})
-        
-        # Calculate true range
-        high_low = df["high"] - df["low"]
-        high_close = (df["high"] - df["close"].shift()).abs()
-        low_close = (df["low"] - df["close"].shift()).abs()
-        
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        
-        # Calculate ATR
-        atr = true_range.rolling(window=window).mean()
-        
-        result_df["atr"] = atr
-        
-        return result_df
+        high = df["high"].to_numpy(dtype=PRICE_DTYPE)
+        low = df["low"].to_numpy(dtype=PRICE_DTYPE)
+        previous_close = df["close"].to_numpy(dtype=PRICE_DTYPE)[:-1]
+        
+        # Calculate true range; the first bar has no previous close
+        true_range = high - low
+        # Chain pairwise maxima in place rather than stacking the three ranges into a temporary
+        np.maximum(true_range[1:], np.abs(high[1:] - previous_close), out=true_range[1:])
+        np.maximum(true_range[1:], np.abs(low[1:] - previous_close), out=true_range[1:])
+        
+        # Calculate ATR as the rolling mean of the true range
+        atr = np.full(len(true_range), np.nan)
+        if window <= len(true_range):
+            cumsum = np.concatenate(([0.0], np.cumsum(true_range, dtype=np.float64)))
+            atr[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+        
+        return pd.DataFrame({"date": df["date"], "atr": atr}, index=df.index)
     
     def _generate_stochastic_oscillator(
         self, 
@@ -238,107 +414,169 @@ class FeatureEngineeringService:
         result_df = pd.DataFrame({"date": df["date"]})
         
         # Calculate %K
-        lowest_low = df["low"].rolling(window=k_window).min()
-        highest_high = df["high"].rolling(window=k_window).max()
+        lowest_low = pd.Series(rolling_min(df["low"].to_numpy(dtype=PRICE_DTYPE), k_window), index=df.index)
+        highest_high = pd.Series(rolling_max(df["high"].to_numpy(dtype=PRICE_DTYPE), k_window), index=df.index)
         k_percent = 100 * ((df["close"] - lowest_low) / (highest_high - lowest_low))
         
         # Calculate %D (simple moving average of %K)
-        d_percent = k_percent.rolling(window=d_window).mean()
+        d_percent = k_percent.rolling(window=d_window).mean(**ROLLING_NUMBA_KW)
         
         result_df["stoch_k"] = k_percent
         result_df["stoch_d"] = d_percent
         
         return result_df
     
-    def _generate_on_balance_volume(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _generate_on_balance_volume(self, df: pd.DataFrame, price_changes: Optional[np.ndarray] = None) -> pd.DataFrame:
         """Generate On-Balance Volume."""
-        result_df = pd.DataFrame({"date": df["date"]})
-        
-        # Calculate price direction
-        price_direction = np.sign(df["close"].diff())
+        if price_changes is None:
+            price_changes = np.diff(df["close"].to_numpy(dtype=PRICE_DTYPE))
         
-        # Calculate OBV
-        obv = (price_direction * df["volume"]).fillna(0).cumsum()
+        # Price direction as int8; comparisons treat a NaN change as no direction
+        direction = (price_changes > 0).astype(np.int8) - (price_changes < 0).astype(np.int8)
+        signed_volume = direction * df["volume"].to_numpy(dtype=np.float64)[1:]
+        np.nan_to_num(signed_volume, copy=False, nan=0.0)
         
-        result_df["obv"] = obv
+        # Calculate OBV; the first bar has no direction and contributes nothing
+        obv = np.empty(len(df))
+        obv[:1] = 0.0
+        np.cumsum(signed_volume, out=obv[1:])
         
-        return result_df
+        return pd.DataFrame({"date": df["date"], "obv": obv}, index=df.index)
     
-    def _generate_price_channel(self, df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
-        """Generate Price Channel."""
-        result_df = pd.DataFrame({"date": df["date"]})
-        
-        # Calculate upper channel (highest high)
-        upper_channel = df["high"].rolling(window=window).max()
+    def _generate_price_channel(
+        self, 
+        df: pd.DataFrame, 
+        window: int = 20,
+        window_stats: Optional[Tuple[np.ndarray, ...]] = None
+    ) -> pd.DataFrame:
+        """Generate Price Channel, reusing precomputed rolling_window_stats for the same window if given."""
+        if window_stats is None:
+            window_stats = self._rolling_window_stats(df, window)
         
-        # Calculate lower channel (lowest low)
-        lower_channel = df["low"].rolling(window=window).min()
+        # Upper channel is the highest high, lower channel the lowest low
+        _, _, upper_channel, lower_channel = window_stats
         
         # Calculate middle channel
         middle_channel = (upper_channel + lower_channel) / 2
         
-        result_df["pc_upper"] = upper_channel
-        result_df["pc_middle"] = middle_channel
-        result_df["pc_lower"] = lower_channel
-        
-        return result_df
+        return pd.DataFrame({
+            "date": df["date"],
+            "pc_upper": upper_channel,
+            "pc_middle": middle_channel,
+            "pc_lower": lower_channel
+        }, index=df.index)
+    
+    def _rolling_window_stats(self, df: pd.DataFrame, window: int) -> Tuple[np.ndarray, ...]:
+        """Compute rolling close mean/std and high max/low min in one fused pass."""
+        return rolling_window_stats(
+            df["close"].to_numpy(dtype=PRICE_DTYPE),
+            df["high"].to_numpy(dtype=PRICE_DTYPE),
+            df["low"].to_numpy(dtype=PRICE_DTYPE),
+            window
+        )
+    
+    def _feature_records(
+        self, 
+        stock_id: int, 
+        features: Dict[str, pd.DataFrame]
+    ) -> List[Tuple[int, datetime, str, float, datetime]]:
+        """Flatten generated feature frames into long-format COPY records, skipping missing dates and NaN values."""
+        created_at = datetime.now()
+        records = []
+        for feature_type, feature_df in features.items():
+            if feature_df.empty or "date" not in feature_df:
+                continue
+            
+            dates = pd.to_datetime(feature_df["date"])
+            has_date = dates.notna().to_numpy()
+            timestamps = np.asarray(dates.dt.to_pydatetime(), dtype=object)
+            
+            keys = [key for key in feature_df.columns if key != "date"]
+            feature_names = np.array([
+                f"{feature_type}_{key}" if key != feature_type else feature_type for key in keys
+            ], dtype=object)
+            
+            # Mask every dated, non-NaN cell of the frame at once and pull out aligned triples
+            values = feature_df[keys].to_numpy(dtype=np.float64)
+            rows, cols = np.nonzero(has_date[:, None] & ~np.isnan(values))
+            
+            records.extend(zip(
+                repeat(stock_id),
+                timestamps[rows],
+                feature_names[cols],
+                values[rows, cols].tolist(),
+                repeat(created_at)
+            ))
+        
+        return records
     
     async def store_features(
         self, 
         stock_id: int, 
-        features: Dict[str, List[Dict[str, Any]]], 
+        features: Dict[str, pd.DataFrame], 
         session: Optional[AsyncSession] = None
     ) -> None:
         """Store generated features in the database."""
         if not features:
             return
         
+        try:
+            records = self._feature_records(stock_id, features)
+            await self._copy_feature_records(records, session)
+        except Exception as e:
+            logger.error("Error storing features for stock_id %s: %s", stock_id, e)
+            raise
+        
+        if records:
+            logger.info("Stored %d feature records for stock_id %s", len(records), stock_id)
+    
+    async def store_features_for_stocks(
+        self, 
+        features_by_stock: Dict[int, Dict[str, pd.DataFrame]], 
+        session: Optional[AsyncSession] = None
+    ) -> None:
+        """Store generated features for several stocks with a single COPY."""
+        if not features_by_stock:
+            return
+        
+        try:
+            records = []
+            for stock_id, features in features_by_stock.items():
+                records.extend(self._feature_records(stock_id, features))
+            await self._copy_feature_records(records, session)
+        except Exception as e:
+            logger.error("Error storing features for stock_ids %s: %s", list(features_by_stock), e)
+            raise
+        
+        if records:
+            logger.info("Stored %d feature records for %d stocks", len(records), len(features_by_stock))
+    
+    async def _copy_feature_records(
+        self, 
+        records: List[Tuple[int, datetime, str, float, datetime]], 
+        session: Optional[AsyncSession] = None
+    ) -> None:
+        """Bulk load feature records with a single binary COPY."""
+        if not records:
+            return
+        
         use_provided_session = session is not None
         
         if not use_provided_session:
-            session = get_timescale_db_session()
+            session = TimeScaleAsyncSessionLocal()
         
         try:
-            # Flatten features data
-            feature_rows = []
-            for feature_type, feature_data in features.items():
-                for record in feature_data:
-                    # Skip records with missing date
-                    if "date" not in record:
-                        continue
-                    
-                    date = record["date"]
-                    
-                    for key, value in record.items():
-                        # Skip date column
-                        if key == "date":
-                            continue
-                        
-                        # Skip NaN values
-                        if pd.isna(value):
-                            continue
-                        
-                        feature_name = f"{feature_type}_{key}" if key != feature_type else feature_type
-                        
-                        feature_row = StockFeatureData(
-                            stock_id=stock_id,
-                            timestamp=date if isinstance(date, datetime) else pd.Timestamp(date).to_pydatetime(),
-                            feature_name=feature_name,
-                            feature_value=float(value),
-                            created_at=datetime.now()
-                        )
-                        
-                        feature_rows.append(feature_row)
-            
-            # Bulk insert features
-            if feature_rows:
-                session.add_all(feature_rows)
-                await session.commit()
-                
-                logger.info(f"Stored {len(feature_rows)} feature records for stock_id {stock_id}")
-        except Exception as e:
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                FEATURE_DATA_TABLE,
+                schema_name=FEATURE_DATA_SCHEMA,
+                columns=FEATURE_DATA_COLUMNS,
+                records=records
+            )
+            await session.commit()
+        except Exception:
             await session.rollback()
-            logger.error(f"Error storing features for stock_id {stock_id}: {str(e)}")
             raise
         finally:
             if not use_provided_session:
@@ -0,0 +1,171 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True, fastmath=True)
+def multi_sma(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    Compute simple moving averages for several windows from one cumulative sum.
+    
+    Matches pandas rolling(window).mean() for each window.
+    
+    Args:
+        values: 1-D float32 or float64 series
+        windows: SMA windows, one output row per window
+        
+    Returns:
+        Array of shape (len(windows), len(values)), NaN until each window fills
+    """
+    n = values.shape[0]
+    k = windows.shape[0]
+    out = np.full((k, n), np.nan)
+    
+    # One float64 cumulative sum serves every window: sum(x[i-w+1..i]) = cumsum[i+1] - cumsum[i+1-w]
+    cumsum = np.empty(n + 1)
+    cumsum[0] = 0.0
+    for i in range(n):
+        cumsum[i + 1] = cumsum[i] + values[i]
+    
+    for j in range(k):
+        window = windows[j]
+        for i in range(window - 1, n):
+            out[j, i] = (cumsum[i + 1] - cumsum[i + 1 - window]) / window
+    
+    return out
+
+@njit(cache=True, fastmath=True)
+def multi_ema(values: np.ndarray, spans: np.ndarray) -> np.ndarray:
+    """
+    Compute exponential moving averages for several spans in one compiled call.
+    
+    Matches pandas ewm(span=span, adjust=False).mean() for each span.
+    
+    Args:
+        values: 1-D float32 or float64 series
+        spans: EMA spans, one output row per span
+        
+    Returns:
+        Array of shape (len(spans), len(values))
+    """
+    n = values.shape[0]
+    k = spans.shape[0]
+    out = np.empty((k, n))
+    if n == 0:
+        return out
+    
+    # Each span's recurrence is independent, one output row per span
+    for j in range(k):
+        alpha = 2.0 / (spans[j] + 1.0)
+        out[j, 0] = values[0]
+        for i in range(1, n):
+            out[j, i] = alpha * values[i] + (1.0 - alpha) * out[j, i - 1]
+    
+    return out
+
+@njit(cache=True)
+def _rolling_extreme(values: np.ndarray, window: int, is_max: bool) -> np.ndarray:
+    """Rolling max or min in O(n) using a monotonic deque of indices."""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    deque = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    
+    for i in range(n):
+        # Drop indices whose values can no longer be the window's extreme
+        while tail > head and (values[deque[tail - 1]] <= values[i] if is_max else values[deque[tail - 1]] >= values[i]):
+            tail -= 1
+        deque[tail] = i
+        tail += 1
+        
+        # Drop the front index once it falls out of the window
+        if deque[head] <= i - window:
+            head += 1
+        
+        if i >= window - 1:
+            out[i] = values[deque[head]]
+    
+    return out
+
+@njit(cache=True)
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling maximum, matching pandas rolling(window).max()."""
+    return _rolling_extreme(values, window, True)
+
+@njit(cache=True)
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling minimum, matching pandas rolling(window).min()."""
+    return _rolling_extreme(values, window, False)
+
+@njit(cache=True, fastmath=True)
+def rolling_window_stats(close: np.ndarray, high: np.ndarray, low: np.ndarray, window: int):
+    """
+    Compute the rolling statistics shared by the window indicators in one pass.
+    
+    Matches pandas rolling(window) mean() and std() of close, max() of high and min() of low.
+    The mean and variance are updated as each close enters and leaves the window, and the
+    extremes come from monotonic deques maintained in the same loop, so the cost is O(n).
+    
+    Args:
+        close: 1-D float32 or float64 close prices
+        high: 1-D float32 or float64 high prices
+        low: 1-D float32 or float64 low prices
+        window: Rolling window length
+        
+    Returns:
+        Tuple of (mean, std, highest_high, lowest_low) arrays, NaN until the window fills
+    """
+    n = close.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    highest = np.full(n, np.nan)
+    lowest = np.full(n, np.nan)
+    
+    max_deque = np.empty(n, dtype=np.int64)
+    min_deque = np.empty(n, dtype=np.int64)
+    max_head = 0
+    max_tail = 0
+    min_head = 0
+    min_tail = 0
+    
+    # Welford running mean and sum of squared deviations of the closes in the window
+    window_mean = 0.0
+    m2 = 0.0
+    
+    for i in range(n):
+        value = float(close[i])
+        if i < window:
+            delta = value - window_mean
+            window_mean += delta / (i + 1)
+            m2 += delta * (value - window_mean)
+        else:
+            # Replace the close leaving the window with the one entering it
+            old = float(close[i - window])
+            delta = value - old
+            new_mean = window_mean + delta / window
+            m2 += delta * (value - new_mean + old - window_mean)
+            window_mean = new_mean
+        
+        # Drop indices whose values can no longer be the window's extreme
+        while max_tail > max_head and high[max_deque[max_tail - 1]] <= high[i]:
+            max_tail -= 1
+        max_deque[max_tail] = i
+        max_tail += 1
+        while min_tail > min_head and low[min_deque[min_tail - 1]] >= low[i]:
+            min_tail -= 1
+        min_deque[min_tail] = i
+        min_tail += 1
+        
+        # Drop the front indices once they fall out of the window
+        if max_deque[max_head] <= i - window:
+            max_head += 1
+        if min_deque[min_head] <= i - window:
+            min_head += 1
+        
+        if i >= window - 1:
+            mean[i] = window_mean
+            if window > 1:
+                std[i] = np.sqrt(max(m2, 0.0) / (window - 1))
+            highest[i] = high[max_deque[max_head]]
+            lowest[i] = low[min_deque[min_head]]
+    
+    return mean, std, highest, lowest
\ No newline at end of file
@@ -0,0 +1,30 @@
+import logging
+from typing import Optional
+import orjson
+from redis.asyncio import Redis
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis pub/sub channel the dashboard listens on to invalidate its caches
+MODEL_EVENTS_CHANNEL = "model.events"
+
+_redis_client: Optional[Redis] = None
+
+def get_events_redis_client() -> Redis:
+    """Get the Redis client used to publish model events."""
+    global _redis_client
+    
+    if _redis_client is None:
+        _redis_client = Redis.from_url(str(settings.REDIS_URL))
+    
+    return _redis_client
+
+async def publish_model_event(model_id: int, event_type: str = "model.updated") -> None:
+    """Publish a model change so consumers can drop data cached for it."""
+    try:
+        message = orjson.dumps({"type": event_type, "model_id": model_id})
+        await get_events_redis_client().publish(MODEL_EVENTS_CHANNEL, message)
+    except Exception as e:
+        logger.error(f"Error publishing {event_type} event for model {model_id}: {str(e)}")
\ No newline at end of file
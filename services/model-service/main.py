@@ -1,5 +1,6 @@
 import logging
 from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db import get_db_session
@@ -8,6 +9,7 @@ from api.router import router as api_router
 from services.model_registry import ModelRegistry
 from services.training_service import TrainingService
 from services.inference_service import InferenceService
+from models.arima_model import shutdown_order_search_executor
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +23,7 @@ app = FastAPI(
     title="Stock Prediction Platform - Model Service",
     description="Service for training and serving machine learning models for stock prediction",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Include API router
@@ -41,10 +44,20 @@ async def startup_event():
     
     logger.info("Model service started")
 
-# Health check endpoint
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Stopping model service")
+    
+    # Stop the ARIMA order search workers
+    shutdown_order_search_executor()
+
+# Health check endpoint, served from a response encoded once at import
+_HEALTH_RESPONSE = ORJSONResponse({"status": "healthy"})
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
 # Main entry point
 if __name__ == "__main__":
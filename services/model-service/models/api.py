@@ -1,9 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+# Request bodies reject unknown keys; "model_" field names are part of the API
+REQUEST_MODEL_CONFIG = ConfigDict(extra="forbid", protected_namespaces=())
+
 class ModelCreate(BaseModel):
     """Model for creating a new model."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     architecture: str
     name: str
     version: str
@@ -27,6 +32,8 @@ class ModelResponse(BaseModel):
 
 class TrainModelRequest(BaseModel):
     """Model for training a model."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     architecture: str
     name: str
     version: str
@@ -37,18 +44,24 @@ class TrainModelRequest(BaseModel):
 
 class PredictionRequest(BaseModel):
     """Model for generating predictions."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     model_id: int
     stock_id: int
     save_to_db: bool = True
 
 class BatchPredictionRequest(BaseModel):
     """Model for generating batch predictions."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     model_ids: List[int]
     stock_ids: List[int]
     save_to_db: bool = True
 
 class ComparisonRequest(BaseModel):
     """Model for comparing predictions."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     stock_id: int
     model_ids: List[int]
     start_date: Optional[str] = None
@@ -1,11 +1,70 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import statsmodels.api as sm
 from statsmodels.tsa.arima.model import ARIMA
+from threadpoolctl import threadpool_limits
 
 from .base_model import BaseModel
+from .arma_likelihood import fit_arma
+
+_order_search_executor: Optional[ProcessPoolExecutor] = None
+
+def get_order_search_executor() -> ProcessPoolExecutor:
+    """Get the process pool that ARIMA order search fits run in."""
+    global _order_search_executor
+    
+    if _order_search_executor is None:
+        _order_search_executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+    
+    return _order_search_executor
+
+def shutdown_order_search_executor() -> None:
+    """Shut down the ARIMA order search process pool."""
+    global _order_search_executor
+    
+    if _order_search_executor is not None:
+        _order_search_executor.shutdown(cancel_futures=True)
+        _order_search_executor = None
+
+def _fast_mle_params(ts_data: np.ndarray, order: Tuple[int, int, int]) -> np.ndarray:
+    """Estimate ARIMA parameters in statsmodels' layout with the innovations algorithm."""
+    p, d, q = order
+    y = np.diff(ts_data.astype(np.float64), n=d)
+    
+    # statsmodels includes a constant only for undifferenced series; it is fixed at the
+    # sample mean rather than estimated jointly with the ARMA terms
+    const = []
+    if d == 0:
+        const = [y.mean()]
+        y = y - const[0]
+    
+    ar, ma, sigma2 = fit_arma(y, p, q)
+    return np.concatenate([const, ar, ma, [sigma2]])
+
+def _fit_arima(ts_data: np.ndarray, order: Tuple[int, int, int], fast_mle: bool = False):
+    """Fit an ARIMA model of the given order and return the statsmodels results."""
+    arima = ARIMA(ts_data, order=order)
+    
+    # The state-space matrices are tiny, so multithreaded BLAS only adds overhead
+    with threadpool_limits(limits=1, user_api="blas"):
+        if fast_mle:
+            # Estimate with the JIT-compiled innovations likelihood and run the state-space
+            # filter once at those parameters, skipping statsmodels' optimizer loop
+            return arima.filter(_fast_mle_params(ts_data, order))
+        
+        return arima.fit()
+
+def _fit_order_aic(ts_data: np.ndarray, order: Tuple[int, int, int], fast_mle: bool = False) -> float:
+    """Fit one candidate order in a worker process and return its AIC."""
+    try:
+        return float(_fit_arima(ts_data, order, fast_mle).aic)
+    except Exception:
+        return float("inf")
 
 class ARIMAImplementation(BaseModel):
     """Implementation of ARIMA model for stock prediction."""
@@ -34,15 +93,20 @@ class ARIMAImplementation(BaseModel):
         # Prepare time series data
         ts_data = train_data[target_col].values
         
+        fast_mle = self.hyperparameters.get("fast_mle", False)
+        
+        # Optionally pick (p, q) by AIC, fitting every candidate order in parallel
+        if self.hyperparameters.get("auto_order", False):
+            self.p, self.q = await self._search_order(ts_data, fast_mle)
+            self.hyperparameters.update(p=self.p, q=self.q)
+        
         # Fit ARIMA model
-        self.model = ARIMA(
-            ts_data, 
-            order=(self.p, self.d, self.q)
-        ).fit()
+        self.model = _fit_arima(ts_data, (self.p, self.d, self.q), fast_mle)
         
         # Calculate training metrics
+        # Fitted values cover the whole series; skip the burn-in before the lags are available
         train_pred = self.model.fittedvalues
-        train_mse = ((ts_data[self.p+self.d:] - train_pred) ** 2).mean()
+        train_mse = ((ts_data[self.p+self.d:] - train_pred[self.p+self.d:]) ** 2).mean()
         train_rmse = np.sqrt(train_mse)
         
         # Calculate validation metrics if validation data is provided
@@ -78,6 +142,22 @@ class ARIMAImplementation(BaseModel):
         
         return metrics, {}
     
+    async def _search_order(self, ts_data: np.ndarray, fast_mle: bool) -> Tuple[int, int]:
+        """Find the (p, q) with the lowest AIC over a grid, keeping d fixed."""
+        p_max = self.hyperparameters.get("p_max", 5)
+        q_max = self.hyperparameters.get("q_max", 5)
+        orders = [(p, self.d, q) for p in range(p_max + 1) for q in range(q_max + 1)]
+        
+        loop = asyncio.get_running_loop()
+        executor = get_order_search_executor()
+        aics = await asyncio.gather(*(
+            loop.run_in_executor(executor, _fit_order_aic, ts_data, order, fast_mle)
+            for order in orders
+        ))
+        
+        p, _, q = orders[int(np.argmin(aics))]
+        return p, q
+    
     async def predict(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate predictions using the trained model."""
         if self.model is None:
@@ -89,16 +169,10 @@ class ARIMAImplementation(BaseModel):
         # Generate forecast
         forecast = self.model.forecast(steps=forecast_horizon)
         
-        # Create result DataFrame
-        result = pd.DataFrame()
-        last_date = data.index[-1]
-        
-        # Assuming the index is datetime
-        for i in range(forecast_horizon):
-            next_date = last_date + pd.Timedelta(days=i+1)
-            result.loc[next_date, "predicted_close"] = forecast[i]
-        
-        return result
+        # Create result DataFrame in one go, one row per day after the last date
+        # (assuming the index is datetime)
+        index = pd.date_range(data.index[-1] + pd.Timedelta(days=1), periods=forecast_horizon, freq="D")
+        return pd.DataFrame({"predicted_close": np.asarray(forecast)[:forecast_horizon]}, index=index)
     
     def save(self) -> Dict[str, Any]:
             """Save the model state for serialization."""
@@ -0,0 +1,198 @@
+import numpy as np
+from numba import njit
+from scipy.optimize import minimize
+
+# Objective value for AR coefficients outside the stationary region
+NON_STATIONARY_PENALTY = 1e10
+
+@njit(cache=True, fastmath=True)
+def _arma_acovf(ar: np.ndarray, ma: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    Autocovariances of a unit-variance ARMA process up to max_lag.
+    
+    Solves the Brockwell & Davis difference equations exactly rather than
+    truncating the MA(infinity) representation.
+    """
+    p = ar.shape[0]
+    q = ma.shape[0]
+    
+    # psi-weights of the causal representation, needed up to lag q
+    psi = np.zeros(q + 1)
+    psi[0] = 1.0
+    for j in range(1, q + 1):
+        psi[j] = ma[j - 1]
+        for i in range(1, min(j, p) + 1):
+            psi[j] += ar[i - 1] * psi[j - i]
+    
+    # c[k] = sum_{j=k}^{q} theta_j psi_{j-k}, with theta_0 = 1
+    size = max(max_lag, p) + 1
+    c = np.zeros(size)
+    for k in range(min(q, size - 1) + 1):
+        for j in range(k, q + 1):
+            theta = 1.0 if j == 0 else ma[j - 1]
+            c[k] += theta * psi[j - k]
+    
+    # gamma(0..p) from the first p + 1 equations, using gamma(-h) = gamma(h)
+    system = np.zeros((p + 1, p + 1))
+    for k in range(p + 1):
+        system[k, k] += 1.0
+        for i in range(1, p + 1):
+            system[k, abs(k - i)] -= ar[i - 1]
+    
+    gamma = np.zeros(size)
+    gamma[:p + 1] = np.linalg.solve(system, c[:p + 1])
+    
+    # Higher lags follow from the recursion
+    for k in range(p + 1, size):
+        gamma[k] = c[k]
+        for i in range(1, p + 1):
+            gamma[k] += ar[i - 1] * gamma[k - i]
+    
+    return gamma
+
+@njit(cache=True, fastmath=True)
+def _kappa(i: int, j: int, gamma: np.ndarray, ar: np.ndarray, ma: np.ndarray, m: int) -> float:
+    """Covariance of the transformed process at 1-based times i >= j."""
+    h = i - j
+    if i <= m:
+        return gamma[h]
+    if j <= m:
+        if i > 2 * m:
+            return 0.0
+        value = gamma[h]
+        for r in range(1, ar.shape[0] + 1):
+            value -= ar[r - 1] * gamma[abs(r - h)]
+        return value
+    
+    q = ma.shape[0]
+    if h > q:
+        return 0.0
+    # sum_{r=0}^{q-h} theta_r theta_{r+h}, with theta_0 = 1
+    value = ma[h - 1] if h > 0 else 1.0
+    for r in range(1, q - h + 1):
+        value += ma[r - 1] * ma[r + h - 1]
+    return value
+
+@njit(cache=True, fastmath=True)
+def arma_innovations(y: np.ndarray, ar: np.ndarray, ma: np.ndarray):
+    """
+    Run the innovations algorithm for a zero-mean ARMA(p, q) series.
+    
+    Uses the Brockwell & Davis transformation W_t = phi(B) X_t beyond lag
+    max(p, q), so each step only touches the last max(p, q) coefficients and
+    the recursion runs in O(n * max(p, q)^2) without an n x n covariance matrix.
+    
+    Args:
+        y: 1-D float64 observations
+        ar: AR coefficients phi_1..phi_p
+        ma: MA coefficients theta_1..theta_q
+        
+    Returns:
+        Tuple of (innovations, relative variances) with the white noise
+        variance factored out
+    """
+    n = y.shape[0]
+    p = ar.shape[0]
+    q = ma.shape[0]
+    m = max(p, q)
+    width = max(m, 1)
+    gamma = _arma_acovf(ar, ma, 2 * m)
+    
+    # theta[t, j] holds theta_{t, j}; beyond lag width the coefficients are zero
+    theta = np.zeros((n, width + 1))
+    v = np.zeros(n)
+    innovations = np.zeros(n)
+    
+    v[0] = _kappa(1, 1, gamma, ar, ma, m)
+    innovations[0] = y[0]
+    
+    for t in range(1, n):
+        lowest = max(0, t - width)
+        for k in range(lowest, t):
+            value = _kappa(t + 1, k + 1, gamma, ar, ma, m)
+            for j in range(lowest, k):
+                value -= theta[k, k - j] * theta[t, t - j] * v[j]
+            theta[t, t - k] = value / v[k]
+        
+        v[t] = _kappa(t + 1, t + 1, gamma, ar, ma, m)
+        for j in range(lowest, t):
+            v[t] -= theta[t, t - j] ** 2 * v[j]
+        
+        # One-step prediction of y[t] from the past observations and innovations
+        prediction = 0.0
+        if t < m:
+            for j in range(1, t + 1):
+                prediction += theta[t, j] * innovations[t - j]
+        else:
+            for r in range(1, p + 1):
+                prediction += ar[r - 1] * y[t - r]
+            for j in range(1, q + 1):
+                prediction += theta[t, j] * innovations[t - j]
+        
+        innovations[t] = y[t] - prediction
+    
+    return innovations, v
+
+@njit(cache=True, fastmath=True)
+def arma_concentrated_loglike(y: np.ndarray, ar: np.ndarray, ma: np.ndarray) -> float:
+    """Negative reduced (variance-concentrated) exact Gaussian log-likelihood of an ARMA model."""
+    innovations, v = arma_innovations(y, ar, ma)
+    n = y.shape[0]
+    
+    squares = 0.0
+    log_det = 0.0
+    for t in range(n):
+        if v[t] <= 0.0:
+            return np.inf
+        squares += innovations[t] ** 2 / v[t]
+        log_det += np.log(v[t])
+    
+    return np.log(squares / n) + log_det / n
+
+def _is_stationary(ar: np.ndarray) -> bool:
+    """Whether the AR polynomial has all roots outside the unit circle."""
+    if ar.size == 0:
+        return True
+    return bool(np.all(np.abs(np.roots(np.r_[1.0, -ar][::-1])) > 1.0))
+
+def _start_params(y: np.ndarray, p: int, q: int) -> np.ndarray:
+    """Least-squares AR coefficients with zero MA terms as optimizer start values."""
+    ar = np.zeros(p)
+    if 0 < p < y.shape[0] - p:
+        lags = np.column_stack([y[p - i - 1:y.shape[0] - i - 1] for i in range(p)])
+        ar = np.linalg.lstsq(lags, y[p:], rcond=None)[0]
+        if not _is_stationary(ar):
+            ar = np.zeros(p)
+    
+    return np.concatenate([ar, np.zeros(q)])
+
+def fit_arma(y: np.ndarray, p: int, q: int):
+    """
+    Fit a zero-mean ARMA(p, q) model by exact maximum likelihood.
+    
+    Args:
+        y: 1-D demeaned, differenced series
+        p: AR order
+        q: MA order
+        
+    Returns:
+        Tuple of (ar, ma, sigma2) estimates
+    """
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    
+    def objective(params):
+        ar = params[:p]
+        # A finite penalty keeps the quasi-Newton line search inside the stationary region
+        if not _is_stationary(ar):
+            return NON_STATIONARY_PENALTY
+        return arma_concentrated_loglike(y, ar, params[p:])
+    
+    params = np.zeros(0)
+    if p + q > 0:
+        params = minimize(objective, _start_params(y, p, q), method="L-BFGS-B").x
+    
+    ar, ma = params[:p], params[p:]
+    innovations, v = arma_innovations(y, ar, ma)
+    sigma2 = float(np.mean(innovations ** 2 / v))
+    
+    return ar, ma, sigma2
\ No newline at end of file
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
 from datetime import datetime
 
@@ -96,18 +97,21 @@ class BaseModel(ABC):
             forecast_horizon: Number of future time steps to predict
             
         Returns:
-            Tuple of (X, y) arrays for model training/prediction
+            Tuple of (X, y) float32 arrays for model training/prediction; both are
+            read-only strided views, so copy them before modifying in place
         """
-        X, y = [], []
+        n_samples = len(df) - lookback_window - forecast_horizon + 1
+        if n_samples <= 0:
+            return (
+                np.empty((0, lookback_window, len(features)), dtype=np.float32),
+                np.empty((0, forecast_horizon), dtype=np.float32)
+            )
         
-        for i in range(len(df) - lookback_window - forecast_horizon + 1):
-            # Input window
-            X_window = df.iloc[i:i+lookback_window][features].values
-            
-            # Target window
-            y_window = df.iloc[i+lookback_window:i+lookback_window+forecast_horizon][target].values
-            
-            X.append(X_window)
-            y.append(y_window)
+        feature_values = df[features].to_numpy(dtype=np.float32)
+        target_values = df[target].to_numpy(dtype=np.float32)
+        
+        # Every window is a strided view over the same arrays, so no per-sample copies are made
+        X = sliding_window_view(feature_values, (lookback_window, len(features)))[:n_samples, 0]
+        y = sliding_window_view(target_values, forecast_horizon)[lookback_window:lookback_window + n_samples]
         
-        return np.array(X), np.array(y)
\ No newline at end of file
+        return X, y
\ No newline at end of file
@@ -1,3 +1,4 @@
+import math
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -71,18 +72,16 @@ class TemporalFusionTransformerImplementation(BaseModel):
             )
         
         # Convert to PyTorch tensors
-        X_train = torch.tensor(X_train, dtype=torch.float32).to(self.device)
-        y_train = torch.tensor(y_train, dtype=torch.float32).to(self.device)
+        X_train = self._to_device(X_train)
+        y_train = self._to_device(y_train)
         
         if X_val is not None and y_val is not None:
-            X_val = torch.tensor(X_val, dtype=torch.float32).to(self.device)
-            y_val = torch.tensor(y_val, dtype=torch.float32).to(self.device)
+            X_val = self._to_device(X_val)
+            y_val = self._to_device(y_val)
         
-        # Create data loaders
-        train_dataset = torch.utils.data.TensorDataset(X_train, y_train)
-        train_loader = torch.utils.data.DataLoader(
-            train_dataset, batch_size=self.batch_size, shuffle=True
-        )
+        # Batches are sliced straight from the device-resident tensors
+        num_samples = X_train.size(0)
+        num_batches = math.ceil(num_samples / self.batch_size)
         
         # Initialize model
         num_time_varying_features = len(self.time_varying_features)
@@ -103,6 +102,15 @@ class TemporalFusionTransformerImplementation(BaseModel):
         # Initialize loss function
         criterion = nn.MSELoss()
         
+        # On GPU, train a compiled graph under mixed precision; self.model stays the plain
+        # module so its state dict keys are unchanged for save and load
+        use_cuda = self.device.type == "cuda"
+        train_model = torch.compile(self.model, mode="reduce-overhead") if use_cuda else self.model
+        amp_dtype = torch.bfloat16 if use_cuda and torch.cuda.is_bf16_supported() else torch.float16
+        
+        # BF16 keeps FP32's exponent range, so only FP16 needs loss scaling
+        scaler = torch.amp.GradScaler("cuda", enabled=use_cuda and amp_dtype == torch.float16)
+        
         # Training loop
         self.model.train()
         best_val_loss = float('inf')
@@ -111,38 +119,45 @@ class TemporalFusionTransformerImplementation(BaseModel):
         for epoch in range(self.num_epochs):
             epoch_loss = 0.0
             
-            for batch_X, batch_y in train_loader:
-                optimizer.zero_grad()
+            # Shuffle on the device each epoch instead of going through a DataLoader
+            permutation = torch.randperm(num_samples, device=self.device)
+            for start in range(0, num_samples, self.batch_size):
+                batch_indices = permutation[start:start + self.batch_size]
+                batch_X = X_train[batch_indices]
+                batch_y = y_train[batch_indices]
+                
+                optimizer.zero_grad(set_to_none=True)
                 
-                # Create dummy static features if none provided
+                # Create dummy static features if none provided; expand broadcasts
+                # the static row over the batch as a view instead of copying it
                 batch_static = None
                 if static_data is not None:
-                    batch_static = static_data.unsqueeze(0).repeat(batch_X.size(0), 1)
+                    batch_static = static_data.unsqueeze(0).expand(batch_X.size(0), -1)
                 
-                # Forward pass
-                outputs = self.model(batch_static, batch_X, None)  # No decoder inputs for training
-                
-                # Calculate loss
-                loss = criterion(outputs, batch_y)
+                # Forward pass and loss
+                with torch.autocast(device_type=self.device.type, dtype=amp_dtype, enabled=use_cuda):
+                    outputs = train_model(batch_static, batch_X, None)  # No decoder inputs for training
+                    loss = criterion(outputs, batch_y)
                 
                 # Backward pass and optimize
-                loss.backward()
-                optimizer.step()
+                scaler.scale(loss).backward()
+                scaler.step(optimizer)
+                scaler.update()
                 
                 epoch_loss += loss.item()
             
-            avg_epoch_loss = epoch_loss / len(train_loader)
+            avg_epoch_loss = epoch_loss / num_batches
             metrics["train_loss"].append(avg_epoch_loss)
             
             # Validate if validation data is provided
             if X_val is not None and y_val is not None:
                 self.model.eval()
-                with torch.no_grad():
+                with torch.inference_mode(), torch.autocast(device_type=self.device.type, dtype=amp_dtype, enabled=use_cuda):
                     val_static = None
                     if static_data is not None:
-                        val_static = static_data.unsqueeze(0).repeat(X_val.size(0), 1)
+                        val_static = static_data.unsqueeze(0).expand(X_val.size(0), -1)
                     
-                    val_outputs = self.model(val_static, X_val, None)
+                    val_outputs = train_model(val_static, X_val, None)
                     val_loss = criterion(val_outputs, y_val).item()
                     metrics["val_loss"].append(val_loss)
                     
@@ -176,6 +191,15 @@ class TemporalFusionTransformerImplementation(BaseModel):
         
         return final_metrics, self.feature_importance_scores
     
+    def _to_device(self, array: np.ndarray) -> torch.Tensor:
+        """Move a float32 array to the model's device with a single copy."""
+        # from_numpy shares the array's memory; on GPU the pinned staging copy lets the
+        # transfer run asynchronously instead of blocking on pageable memory
+        tensor = torch.from_numpy(np.ascontiguousarray(array, dtype=np.float32))
+        if self.device.type == "cuda":
+            return tensor.pin_memory().to(self.device, non_blocking=True)
+        return tensor
+    
     async def predict(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate predictions using the trained model."""
         if self.model is None:
@@ -212,16 +236,10 @@ class TemporalFusionTransformerImplementation(BaseModel):
             prediction = self.model(static_input, latest_window, None)
             prediction = prediction.cpu().numpy()[0]  # Remove batch dimension
         
-        # Create result DataFrame
-        result = pd.DataFrame()
-        last_date = data.index[-1]
-        
-        # Assuming the index is datetime
-        for i in range(forecast_horizon):
-            next_date = last_date + pd.Timedelta(days=i+1)
-            result.loc[next_date, "predicted_close"] = prediction[i]
-        
-        return result
+        # Create result DataFrame in one go, one row per day after the last date
+        # (assuming the index is datetime)
+        index = pd.date_range(data.index[-1] + pd.Timedelta(days=1), periods=forecast_horizon, freq="D")
+        return pd.DataFrame({"predicted_close": prediction.reshape(-1)[:forecast_horizon]}, index=index)
     
     def save(self) -> Dict[str, Any]:
         """Save the model state for serialization."""
@@ -293,11 +311,12 @@ class TemporalFusionTransformerImplementation(BaseModel):
             # Create dummy static features if none provided
             sample_static = None
             if self.static_features and len(self.static_features) > 0:
-                # Create a dummy static tensor
+                # Create a dummy static tensor, broadcast over the batch without copying
                 sample_static = torch.zeros(
-                    (sample_X.size(0), len(self.static_features)), 
-                    dtype=torch.float32
-                ).to(self.device)
+                    len(self.static_features), 
+                    dtype=torch.float32,
+                    device=self.device
+                ).expand(sample_X.size(0), -1)
             
             # Forward pass to get attention weights
             _, attn_weights = self.model(sample_static, sample_X, None, return_attention=True)
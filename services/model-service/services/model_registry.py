@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from db import get_db_session
 from models.model_management import ModelArchitecture, Model, TrainingHistory
 from minio_client import get_minio_client
+from events import publish_model_event
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +86,9 @@ class ModelRegistry:
             await session.refresh(new_model)
             
             logger.info(f"Created new model: {name} version {version}")
-            return new_model
+        
+        await publish_model_event(new_model.id, "model.created")
+        return new_model
     
     async def get_model(self, model_id: int) -> Optional[Model]:
         """Get a model by ID."""
@@ -133,7 +136,9 @@ class ModelRegistry:
             await session.commit()
             
             logger.info(f"Updated model {model_id} status to {status}")
-            return True
+        
+        await publish_model_event(model_id)
+        return True
     
     async def store_model_artifact(
         self, 
@@ -273,7 +278,9 @@ class ModelRegistry:
                 await session.commit()
                 
                 logger.info(f"Recorded feature importance for model {model_id}")
-                return True
+            
+            await publish_model_event(model_id)
+            return True
         
         except Exception as e:
             logger.error(f"Error recording feature importance: {str(e)}")